@@ -3,8 +3,11 @@
 """This package contains helpers for building tools around OSM tiles.
 """
 
+import pyosmkit.aio  # noqa: F401
+import pyosmkit.expiry  # noqa: F401
 import pyosmkit.mbtile  # noqa: F401
 import pyosmkit.metatile  # noqa: F401
+import pyosmkit.paths  # noqa: F401
 import pyosmkit.point  # noqa: F401
 import pyosmkit.polygon  # noqa: F401
 import pyosmkit.tile  # noqa: F401
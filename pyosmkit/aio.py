@@ -0,0 +1,83 @@
+#!/usr/bin/python
+"""Provides helpers for asyncio wrappers: bounded thread pool executor for blocking file
+operations and coalescing of concurrent calls with the same key.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# count of threads in default executor
+DEFAULT_MAX_WORKERS = 8
+
+_default_executor = None
+_default_executor_lock = threading.Lock()
+
+
+def default_executor():
+    """Returns shared ThreadPoolExecutor with DEFAULT_MAX_WORKERS threads, created on first use."""
+
+    global _default_executor
+    with _default_executor_lock:
+        if _default_executor is None:
+            _default_executor = ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS,
+                                                   thread_name_prefix="pyosmkit-aio")
+        return _default_executor
+
+
+async def run(func, *args, executor=None, **kwargs):
+    """Runs blocking func(*args, **kwargs) in executor (default_executor() if None).
+
+    >>> asyncio.run(run(sum, [1, 2, 3]))
+    6
+    """
+
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor or default_executor(),
+                                      functools.partial(func, *args, **kwargs))
+
+
+class Coalescer(object):
+    """Coalescer runs one blocking call per key at a time. Callers which request the same key
+    while the call is running wait for it and share its result (or exception).
+
+    Args:
+        executor (concurrent.futures.Executor): executor for blocking calls (optional)
+        guard (callable): returns async context manager entered before every blocking call, eg
+            for limiting count of calls in executor (optional)
+
+    Attributes:
+        calls (int): count of started blocking calls
+    """
+
+    def __init__(self, executor=None, guard=None):
+        self.executor = executor
+        self.guard = guard
+        self.calls = 0
+        self._running = {}
+
+    def __len__(self):
+        """Returns count of running calls."""
+
+        return len(self._running)
+
+    async def run(self, key, func, *args, **kwargs):
+        """Runs func(*args, **kwargs) in executor or joins already running call for key."""
+
+        future = self._running.get(key)
+        if future is None:
+            self.calls += 1
+            future = asyncio.ensure_future(self._call(func, *args, **kwargs))
+            self._running[key] = future
+            future.add_done_callback(lambda _: self._running.pop(key, None))
+
+        # cancellation of one caller must not cancel the call shared with others
+        return await asyncio.shield(future)
+
+    async def _call(self, func, *args, **kwargs):
+        if self.guard is None:
+            return await run(func, *args, executor=self.executor, **kwargs)
+
+        async with self.guard():
+            return await run(func, *args, executor=self.executor, **kwargs)
@@ -0,0 +1,160 @@
+#!/usr/bin/python
+"""Provides processing of expired tiles lists (z/x/y lines, eg osm2pgsql expiry output): expanding
+to zoom range, collapsing to unique metatiles and invalidating metatile files.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+from pyosmkit.metatile.metatile import META_EXT, META_SIZE, xy_to_hashes
+from pyosmkit.point import ZXY
+
+# mtime of touched metatiles, mod_tile treats metatiles older than planet timestamp as dirty
+DIRTY_MTIME = 946681200
+DEFAULT_JOBS = 8
+
+
+def read_expiry(lines):
+    """Parses lines (iterable of str with format z/x/y, eg file object). Empty lines are skipped.
+    Returns generator of ZXY.
+
+    Raises:
+        ValueError: if line has other format
+
+    >>> list(read_expiry(["10/697/321\\n", "\\n", "10/696/320"]))
+    [ZXY(z=10, x=697, y=321), ZXY(z=10, x=696, y=320)]
+    """
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        z, x, y = line.split("/")
+        yield ZXY(int(z), int(x), int(y))
+
+
+def expire_metatiles(tiles, min_zoom=None, max_zoom=None):
+    """Expands tiles (iterable of ZXY) to zooms from min_zoom to max_zoom (parents and children of
+    every tile) and collapses them to unique metatiles. If zoom limit is not set, tile zoom is
+    used. Returns generator of ZXY (coordinates of top left tile of metatile).
+
+    >>> list(expire_metatiles([ZXY(10, 697, 321), ZXY(10, 696, 320)]))
+    [ZXY(z=10, x=696, y=320)]
+    >>> list(expire_metatiles([ZXY(10, 697, 321)], min_zoom=9, max_zoom=11))
+    [ZXY(z=9, x=344, y=160), ZXY(z=10, x=696, y=320), ZXY(z=11, x=1392, y=640)]
+    """
+
+    mask = ~(META_SIZE - 1)
+    seen = set()
+    # tiles of the same metatile have the same parents
+    seen_parents = set()
+
+    for z, x, y in tiles:
+        lo = z if min_zoom is None else min_zoom
+        hi = z if max_zoom is None else max_zoom
+
+        key = z, x & mask, y & mask
+        if key not in seen_parents:
+            seen_parents.add(key)
+            for pz in range(lo, min(z, hi + 1)):
+                shift = z - pz
+                mt = ZXY(pz, (x >> shift) & mask, (y >> shift) & mask)
+                if mt not in seen:
+                    seen.add(mt)
+                    yield mt
+
+        if lo <= z <= hi:
+            mt = ZXY(z, x & mask, y & mask)
+            if mt not in seen:
+                seen.add(mt)
+                yield mt
+
+        for cz in range(max(z + 1, lo), hi + 1):
+            shift = cz - z
+            min_x = (x << shift) & mask
+            min_y = (y << shift) & mask
+            max_x = ((x + 1) << shift) - 1
+            max_y = ((y + 1) << shift) - 1
+            for mx in range(min_x, max_x + 1, META_SIZE):
+                for my in range(min_y, max_y + 1, META_SIZE):
+                    mt = ZXY(cz, mx, my)
+                    if mt not in seen:
+                        seen.add(mt)
+                        yield mt
+
+
+def metatile_paths(metatiles, style="", basedir=""):
+    """Returns generator of filepaths (str) for metatiles (iterable of ZXY).
+
+    >>> list(metatile_paths([ZXY(10, 696, 320)], "mapname", "/cache"))
+    ['/cache/mapname/10/0/0/33/180/128.meta']
+    """
+
+    prefixes = {}
+    for z, x, y in metatiles:
+        prefix = prefixes.get(z)
+        if prefix is None:
+            prefix = prefixes[z] = os.path.join(basedir, style, str(z), "")
+        yield "{0}{1}/{2}/{3}/{4}/{5}{6}".format(prefix, *xy_to_hashes(x, y) + [META_EXT])
+
+
+def _touch(path, mtime):
+    try:
+        os.utime(path, (mtime, mtime))
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _delete(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        return False
+    return True
+
+
+def _apply(func, paths, jobs):
+    if jobs <= 1:
+        return sum(1 for path in paths if func(path))
+
+    # file operations release GIL, so threads are enough
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        count = 0
+        for chunk in batches(paths, jobs * 256):
+            count += sum(executor.map(func, chunk))
+        return count
+
+
+def touch(paths, mtime=DIRTY_MTIME, jobs=DEFAULT_JOBS):
+    """Sets access and modification time of files paths (iterable of str) to mtime (int) using
+    jobs (int) threads, so renderer treats them as dirty. Missing files are skipped. Returns count
+    of touched files.
+    """
+
+    return _apply(lambda path: _touch(path, mtime), paths, jobs)
+
+
+def delete(paths, jobs=DEFAULT_JOBS):
+    """Deletes files paths (iterable of str) using jobs (int) threads. Missing files are skipped.
+    Returns count of deleted files.
+    """
+
+    return _apply(_delete, paths, jobs)
+
+
+def batches(iterable, size):
+    """Splits iterable to lists with maximum length size (int), eg for render queue.
+
+    >>> list(batches(range(5), 2))
+    [[0, 1], [2, 3], [4]]
+    """
+
+    iterable = iter(iterable)
+    while True:
+        batch = list(islice(iterable, size))
+        if not batch:
+            return
+        yield batch
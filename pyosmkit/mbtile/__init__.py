@@ -1,3 +1,5 @@
 #!/usr/bin/python
 
+from pyosmkit.mbtile.aio import aopen  # noqa: F401
 from pyosmkit.mbtile.filelike import MBTileFile, open  # noqa: F401
+from pyosmkit.mbtile.pool import Pool  # noqa: F401
@@ -0,0 +1,153 @@
+#!/usr/bin/python
+"""Provides asyncio counterpart of mbtiles reader. Blocking queries run in the bounded executor
+(see pyosmkit.aio) using readers from pyosmkit.mbtile.Pool.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+from pyosmkit.aio import Coalescer, run
+from pyosmkit.mbtile.pool import DEFAULT_MMAP_SIZE, Pool
+
+
+class AsyncMBTileFile(object):
+    """AsyncMBTileFile reads mbtiles file with pool of readers. Concurrent requests for the same
+    tile trigger only one query.
+
+    Every request waits for free reader slot in event loop before it is sent to executor, so
+    executor threads never wait for readers (eg held by running itertiles()).
+
+    Attributes:
+        filename (str): path to the file
+        metadata (Metadata): metadata of mbtiles file
+        bounds (Bounds): bounds of mbtiles file
+    """
+
+    def __init__(self, pool, executor=None, timeout=None):
+        self._pool = pool
+        self._executor = executor
+        self._timeout = timeout
+        self._slots = asyncio.Semaphore(pool.size)
+        self._coalescer = Coalescer(executor, guard=self._slot)
+        self.filename = pool.filename
+        self.metadata = pool.metadata
+        self.bounds = pool.bounds
+
+    def __str__(self):
+        return str(self.metadata)
+
+    def __contains__(self, item):
+        return item in self.bounds
+
+    # async with statement
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, type, value, tb):
+        await self.close()
+
+    async def readtile(self, z, x, y):
+        """See MBTileFile.readtile()."""
+
+        return await self._coalescer.run((z, x, y), self._pool.readtile, z, x, y)
+
+    async def readtiles_many(self, points):
+        """See MBTileFile.readtiles_many()."""
+
+        async with self._slot():
+            return await run(self._pool.readtiles_many, points, executor=self._executor)
+
+    async def itertiles(self, zoom=None, bound=None, batch_size=1000):
+        """Asynchronous generator over tiles, see MBTileFile.itertiles(). Reader is checked out
+        from pool until iteration is finished.
+        """
+
+        async with self._slot():
+            checkout = self._pool.reader()
+            mb = await run(checkout.__enter__, executor=self._executor)
+            tiles = mb.itertiles(zoom=zoom, bound=bound, batch_size=batch_size)
+            future = None
+            try:
+                while True:
+                    future = asyncio.ensure_future(run(_next_batch, tiles, batch_size,
+                                                       executor=self._executor))
+                    batch = await asyncio.shield(future)
+                    if not batch:
+                        break
+
+                    for tile in batch:
+                        yield tile
+            finally:
+                # reader is returned only after cancelled batch is finished in executor thread
+                await asyncio.shield(self._release(future, tiles, checkout))
+
+    async def _release(self, future, tiles, checkout):
+        if future is not None:
+            await asyncio.wait([future])
+
+        await run(_close_reader, tiles, checkout, executor=self._executor)
+
+    @asynccontextmanager
+    async def _slot(self):
+        # count of slots is equal to pool size, so checkout in executor does not wait
+        if self._timeout is None:
+            await self._slots.acquire()
+        else:
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self._timeout)
+            except asyncio.TimeoutError:
+                raise TimeoutError("no free reader in {0} seconds".format(self._timeout))
+
+        try:
+            yield
+        finally:
+            self._slots.release()
+
+    async def close(self):
+        await run(self._pool.close, executor=self._executor)
+
+
+async def aopen(file, flip_y=True, size=4, mmap_size=DEFAULT_MMAP_SIZE, executor=None,
+                timeout=None):
+    """Opens mbtiles file for reading in executor. Returns AsyncMBTileFile.
+
+    Args:
+        file (str): path to the file
+        flip_y (bool): flip y coordinate?
+        size (int): maximum count of readers, see pyosmkit.mbtile.Pool
+        mmap_size (int): sqlite mmap_size pragma value in bytes
+        executor (concurrent.futures.Executor): executor for blocking calls (optional)
+        timeout (float): time to wait for free reader in seconds, TimeoutError is raised after
+            it (None - wait forever)
+
+    >>> import asyncio
+    >>> async def main():
+    ...     async with await aopen("tests/data/0.mbtiles") as mb:
+    ...         data = await mb.readtile(1, 1, 0)
+    ...         count = 0
+    ...         async for z, x, y, _ in mb.itertiles(zoom=15):
+    ...             count += 1
+    ...     return len(data), count
+    >>> asyncio.run(main())
+    (26298, 36)
+    """
+
+    pool = await run(Pool, file, size, flip_y, mmap_size, executor=executor)
+    return AsyncMBTileFile(pool, executor, timeout)
+
+
+def _close_reader(tiles, checkout):
+    try:
+        tiles.close()
+    finally:
+        checkout.__exit__(None, None, None)
+
+
+def _next_batch(tiles, size):
+    batch = []
+    for tile in tiles:
+        batch.append(tile)
+        if len(batch) >= size:
+            break
+
+    return batch
@@ -1,71 +1,206 @@
 #!/usr/bin/python
 
-from collections import namedtuple
+from collections import OrderedDict, namedtuple
+import hashlib
+import math
+import os
 import sqlite3
+import threading
+from urllib.request import pathname2url
 
-from pyosmkit.point import Bound, Bounds
+from pyosmkit.point import Bound, Bounds, zxy_to_latlong
 
 Metadata = namedtuple("Metadata", "center, format, bounds, minzoom, maxzoom")
 
+# pragmas used for bulk loading in "wb" mode, database is consistent only after close(). They are
+# not used in "ab" mode, so crash during appending can't corrupt existing data.
+WRITE_PRAGMAS = (
+    ("page_size", 4096),
+    ("journal_mode", "OFF"),
+    ("synchronous", "OFF"),
+)
+# default count of tiles inserted in one transaction
+WRITE_BATCH_SIZE = 10000
+
+# maximum latitude of web mercator tiles
+MAX_LAT = 85.0511287798
+
+# maximum count of files in bounds registry, least recently used files are evicted
+BOUNDS_REGISTRY_SIZE = 64
+
+# calculated bounds: (realpath, flip_y) -> ((mtime, size), Bounds)
+_bounds_registry = OrderedDict()
+_bounds_registry_lock = threading.Lock()
+
 
 class MBTileFile(object):
     """
     zoom_level = z
     tile_column = x
     tile_row = y
+
+    Both plain (tiles table) and deduplicated (map and images tables joined by tiles view) layouts
+    are supported. In deduplicated layout identical tiles data are stored once, tile_id is the md5
+    hash of data.
     """
 
-    def __init__(self, filename, mode="rb", flip_y=True):
-        if mode not in ("rb"):
+    def __init__(self, filename, mode="rb", flip_y=True, batch_size=WRITE_BATCH_SIZE,
+                 dedup=False, trust_bounds=False, immutable=False, mmap_size=None):
+        if mode not in ("rb", "wb", "ab"):
             raise IOError("mode not supported:", mode)
 
+        if immutable and mode != "rb":
+            raise IOError("immutable supported only for mode rb")
+
+        if mode == "wb" and os.path.exists(filename):
+            os.remove(filename)
+
         self.filename = filename
-        self._conn = sqlite3.connect(filename)
+        self.mode = mode
+        if immutable:
+            # read-only connection without file locking, can be passed between threads but must
+            # not be used by them concurrently
+            uri = "file:{0}?mode=ro&immutable=1".format(pathname2url(os.path.abspath(filename)))
+            self._conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+        else:
+            self._conn = sqlite3.connect(filename)
         self._conn.row_factory = sqlite3.Row
+        if mmap_size is not None:
+            self._conn.execute("PRAGMA mmap_size={0}".format(int(mmap_size)))
         self.flip_y = flip_y
+        self.trust_bounds = trust_bounds
+        self._bounds = None
+        # existing file layout takes precedence over dedup argument
+        if mode == "wb" or not self._has_table("tiles"):
+            self.dedup = dedup
+        else:
+            self.dedup = self._is_dedup()
 
         if mode == "rb":
             self.metadata = self._get_metadata()
-            self.bounds = self._get_bounds()
+        else:
+            self.metadata = None
+            self.batch_size = batch_size
+            self._pending = []
+            self._new_metadata = {}
+            self._format = None
+            self._create_schema()
+
+    def _has_table(self, name):
+        cur = self._conn.cursor()
+        cur.execute("SELECT 1 FROM sqlite_master WHERE name=?", (name,))
+        return cur.fetchone() is not None
+
+    def _is_dedup(self):
+        return self._has_table("map") and self._has_table("images")
+
+    def _create_schema(self):
+        if self.mode == "wb":
+            for name, value in WRITE_PRAGMAS:
+                self._conn.execute("PRAGMA {0}={1}".format(name, value))
+
+        # in "wb" mode tiles (map) index is created on close(), after all tiles are inserted
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS metadata (name text, value text);
+            CREATE UNIQUE INDEX IF NOT EXISTS name ON metadata (name);
+        """)
+
+        if not self.dedup:
+            self._conn.execute("CREATE TABLE IF NOT EXISTS tiles (zoom_level integer, "
+                               "tile_column integer, tile_row integer, tile_data blob)")
+            if self.mode == "ab":
+                self._create_index()
+            return
+
+        # images index is required for skipping already stored data
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS map (zoom_level integer, tile_column integer,
+                                            tile_row integer, tile_id text);
+            CREATE TABLE IF NOT EXISTS images (tile_data blob, tile_id text);
+            CREATE UNIQUE INDEX IF NOT EXISTS images_id ON images (tile_id);
+            CREATE VIEW IF NOT EXISTS tiles AS
+                SELECT map.zoom_level AS zoom_level, map.tile_column AS tile_column,
+                       map.tile_row AS tile_row, images.tile_data AS tile_data
+                FROM map JOIN images ON images.tile_id = map.tile_id;
+        """)
+        if self.mode == "ab":
+            self._create_index()
+
+    def _create_index(self):
+        # tiles written more than once before index creation: the last written row is kept
+        table = "map" if self.dedup else "tiles"
+        index = "map_index" if self.dedup else "tile_index"
+        query = ("CREATE UNIQUE INDEX IF NOT EXISTS {0} ON {1} "
+                 "(zoom_level, tile_column, tile_row)".format(index, table))
+        try:
+            with self._conn:
+                self._conn.execute(query)
+        except sqlite3.IntegrityError:
+            with self._conn:
+                self._conn.execute("DELETE FROM {0} WHERE rowid NOT IN (SELECT max(rowid) "
+                                   "FROM {0} GROUP BY zoom_level, tile_column, tile_row)"
+                                   .format(table))
+                self._conn.execute(query)
 
     def _get_metadata(self):
         cur = self._conn.cursor()
-        cur.execute("SELECT name, value FROM metadata")
-        res = cur.fetchall()
-        for row in res:
-            if "center" in row:
-                center = row["value"]
-            if "format" in row:
-                format_ = row["value"]
-            if "bounds" in row:
-                bounds = row["value"]
-            if "minzoom" in row:
-                minzoom = row["value"]
-            if "maxzoom" in row:
-                maxzoom = row["value"]
+        cur.execute("SELECT name, value FROM metadata WHERE name IN "
+                    "('center', 'format', 'bounds', 'minzoom', 'maxzoom')")
+        values = dict(cur.fetchall())
 
         # TODO: parse metadata values to float and int
-        return Metadata(str(center), str(format_), str(bounds), int(minzoom), int(maxzoom))
+        minzoom = values.get("minzoom")
+        maxzoom = values.get("maxzoom")
+        return Metadata(values.get("center"), values.get("format"), values.get("bounds"),
+                        int(minzoom) if minzoom is not None else None,
+                        int(maxzoom) if maxzoom is not None else None)
+
+    @property
+    def bounds(self):
+        """Bounds of tiles for every zoom, calculated on first access."""
+
+        if self._bounds is None:
+            self._bounds = self._get_bounds()
+
+        return self._bounds
 
     def _get_bounds(self):
+        if self.trust_bounds:
+            return self._bounds_from_metadata()
+
+        if self.mode != "rb":
+            return self._calc_bounds()
+
+        # bounds are shared between readers of the same unchanged file
+        stat = os.stat(self.filename)
+        key = (os.path.realpath(self.filename), self.flip_y)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        with _bounds_registry_lock:
+            cached = _bounds_registry.get(key)
+            if cached is not None and cached[0] == stamp:
+                _bounds_registry.move_to_end(key)
+                return cached[1]
+
+        bounds = self._calc_bounds()
+        with _bounds_registry_lock:
+            _bounds_registry[key] = (stamp, bounds)
+            _bounds_registry.move_to_end(key)
+            while len(_bounds_registry) > BOUNDS_REGISTRY_SIZE:
+                _bounds_registry.popitem(last=False)
+        return bounds
+
+    def _bounds_from_metadata(self):
+        west, south, east, north = [float(v) for v in self.metadata.bounds.split(",")]
         result = []
-        cur = self._conn.cursor()
         for z in range(self.metadata.minzoom, self.metadata.maxzoom + 1):
-            cur.execute("SELECT min(tile_column) as min_x, max(tile_column) as max_x, "
-                        "min(tile_row) as min_y, max(tile_row) as max_y "
-                        "FROM tiles WHERE zoom_level=?", (z,))
-            res = cur.fetchone()
-
-            if self.flip_y:
-                min_y = flip_y_coord(z, int(res["max_y"]))
-                max_y = flip_y_coord(z, int(res["min_y"]))
-            else:
-                min_y = int(res["min_y"])
-                max_y = int(res["max_y"])
-
-            result.append(Bound(z=z,
-                                min_x=int(res["min_x"]), max_x=int(res["max_x"]),
-                                min_y=min_y, max_y=max_y))
+            # east and south edges are exclusive: tiles which start on them are outside of bounds
+            min_x = math.floor(_tile_x(z, west))
+            max_x = max(math.ceil(_tile_x(z, east)) - 1, min_x)
+            min_y = math.floor(_tile_y(z, north))
+            max_y = max(math.ceil(_tile_y(z, south)) - 1, min_y)
+            last = 2**z - 1
+            result.append(Bound(z=z, min_x=min(max(min_x, 0), last), max_x=min(max(max_x, 0), last),
+                                min_y=min(max(min_y, 0), last), max_y=min(max(max_y, 0), last)))
 
         return Bounds(result)
 
@@ -83,7 +218,149 @@ class MBTileFile(object):
         return item in self.bounds
 
     def close(self):
-        self._conn.close()
+        try:
+            if self.mode != "rb" and self._pending is not None:
+                self._finish()
+        finally:
+            self._conn.close()
+
+    def writetile(self, z, x, y, data):
+        """Write tile data (bytes-like) for z, x, y (int) coordinates to mbtile file. Tiles are
+        inserted by batches, tile with the same coordinates replaces existing (or previously
+        written) one.
+
+        Raises:
+            IOError: if file is opened for reading
+        """
+
+        if self.mode == "rb":
+            raise IOError("file not opened for writing")
+
+        if self.flip_y:
+            y = flip_y_coord(z, y)
+
+        if self._format is None:
+            self._format = guess_format(data)
+
+        self._pending.append((z, x, y, data))
+        if len(self._pending) >= self.batch_size:
+            self._flush()
+
+    def writetiles(self, tiles):
+        """Write tiles from iterable of tuples (z, x, y (int), data (bytes-like))."""
+
+        for z, x, y, data in tiles:
+            self.writetile(z, x, y, data)
+
+    def writemetadata(self, **values):
+        """Set metadata values written on close, eg writemetadata(name="map", format="png").
+        Values override metadata calculated from tiles (bounds, center, minzoom, maxzoom, format).
+
+        Raises:
+            IOError: if file is opened for reading
+        """
+
+        if self.mode == "rb":
+            raise IOError("file not opened for writing")
+
+        self._new_metadata.update(values)
+
+    def _flush(self):
+        if not self._pending:
+            return
+
+        if not self.dedup:
+            with self._conn:
+                self._conn.executemany("INSERT OR REPLACE INTO tiles "
+                                       "(zoom_level, tile_column, tile_row, tile_data) "
+                                       "VALUES (?, ?, ?, ?)", self._pending)
+            self._pending = []
+            return
+
+        rows = []
+        images = {}
+        for z, x, y, data in self._pending:
+            tile_id = hashlib.md5(data).hexdigest()
+            rows.append((z, x, y, tile_id))
+            # data is sent once per batch, already stored data is skipped by images index
+            images.setdefault(tile_id, data)
+
+        with self._conn:
+            self._conn.executemany("INSERT OR IGNORE INTO images (tile_data, tile_id) "
+                                   "VALUES (?, ?)", ((d, i) for i, d in images.items()))
+            self._conn.executemany("INSERT OR REPLACE INTO map "
+                                   "(zoom_level, tile_column, tile_row, tile_id) "
+                                   "VALUES (?, ?, ?, ?)", rows)
+        self._pending = []
+
+    @property
+    def dedup_ratio(self):
+        """Ratio of stored tiles count to unique tiles data count (1.0 for plain layout).
+
+        >>> mb = open("tests/data/0.mbtiles")
+        >>> mb.dedup_ratio
+        1.0
+        """
+
+        if not self.dedup:
+            return 1.0
+
+        cur = self._conn.cursor()
+        cur.execute("SELECT (SELECT count(*) FROM map), (SELECT count(*) FROM images)")
+        tiles, images = cur.fetchone()
+        if not images:
+            return 1.0
+
+        return float(tiles) / images
+
+    def _finish(self):
+        self._flush()
+        self._pending = None
+        self._create_index()
+
+        with self._conn:
+            metadata = self._calc_metadata()
+            if self._format is not None:
+                metadata["format"] = self._format
+            metadata.update(self._new_metadata)
+            self._conn.executemany("INSERT OR REPLACE INTO metadata (name, value) VALUES (?, ?)",
+                                   [(k, str(v)) for k, v in metadata.items()])
+
+    def _calc_metadata(self):
+        bounds = self._calc_bounds()
+        if not bounds.bounds:
+            return {}
+
+        zooms = [b.z for b in bounds]
+        # union of tiles extents for all zooms
+        nws = [zxy_to_latlong(b.z, b.min_x, b.min_y) for b in bounds]
+        ses = [zxy_to_latlong(b.z, b.max_x + 1, b.max_y + 1) for b in bounds]
+        west = min(ll.long for ll in nws)
+        north = max(ll.lat for ll in nws)
+        east = max(ll.long for ll in ses)
+        south = min(ll.lat for ll in ses)
+        return {
+            "minzoom": min(zooms),
+            "maxzoom": max(zooms),
+            "bounds": "{0},{1},{2},{3}".format(west, south, east, north),
+            "center": "{0},{1},{2}".format(round((west + east) / 2, 4),
+                                           round((south + north) / 2, 4), min(zooms)),
+        }
+
+    def _calc_bounds(self):
+        # map table avoids joining images in deduplicated layout
+        cur = self._conn.cursor()
+        cur.execute("SELECT zoom_level, min(tile_column), max(tile_column), "
+                    "min(tile_row), max(tile_row) FROM {0} GROUP BY zoom_level".format(
+                        "map" if self.dedup else "tiles"))
+
+        result = []
+        for z, min_x, max_x, min_y, max_y in cur:
+            if self.flip_y:
+                min_y, max_y = flip_y_coord(z, max_y), flip_y_coord(z, min_y)
+            result.append(Bound(z=z, min_x=min_x, max_x=max_x, min_y=min_y, max_y=max_y))
+
+        return Bounds(result)
 
     def readtile(self, z, x, y):
         """Read tile data for z, x, y (int) coordinates from mbtiles file. Return bytes (str).
@@ -111,8 +388,101 @@ class MBTileFile(object):
         # TODO: return str or bytes?
         return res["tile_data"]
 
+    def readtiles_many(self, points, chunk_size=200):
+        """Read tiles data for many points with one query per chunk_size points.
+
+        Args:
+            points: list of ZXY or tuples (z, x, y (int))
+            chunk_size (int): count of points looked up by one query
+
+        Returns: list of bytes in the same order as points, None for missing tiles
+
+        >>> mb = open("tests/data/0.mbtiles")
+        >>> data = mb.readtiles_many([(1, 1, 0), (12, 999, 999)])
+        >>> print(len(data[0]), data[1])
+        26298 None
+        """
+
+        points = list(points)
+        result = [None] * len(points)
+        cur = self._conn.cursor()
+        cur.row_factory = None
+
+        for start in range(0, len(points), chunk_size):
+            chunk = points[start:start + chunk_size]
+            args = []
+            for i, (z, x, y) in enumerate(chunk, start):
+                if self.flip_y:
+                    y = flip_y_coord(z, y)
+                args.extend((i, z, x, y))
+
+            # requested points are joined with tiles index, missing points are not returned
+            values = ", ".join(["(?, ?, ?, ?)"] * len(chunk))
+            cur.execute("WITH req(i, z, x, y) AS (VALUES {0}) "
+                        "SELECT req.i, tiles.tile_data FROM req JOIN tiles "
+                        "ON tiles.zoom_level=req.z AND tiles.tile_column=req.x "
+                        "AND tiles.tile_row=req.y".format(values), args)
+            for i, data in cur:
+                result[i] = data
+
+        return result
+
+    def itertiles(self, zoom=None, bound=None, batch_size=1000):
+        """Iterate over tiles saved in mbtile. Rows are fetched from database by batch_size, so
+        memory usage does not depend on mbtile size.
+
+        Args:
+            zoom (int): return only tiles for given zoom (optional)
+            bound (pyosmkit.point.Bound): return only tiles inside bound (optional)
+            batch_size (int): count of rows fetched at once
+
+        Returns: generator of tuples (z, x, y (int), data (memoryview))
+
+        >>> from pyosmkit.point import Bound
+        >>> mb = open("tests/data/0.mbtiles")
+        >>> for z, x, y, data in mb.itertiles(bound=Bound(z=1, min_x=1, max_x=1, min_y=0, max_y=0)):
+        ...     print(z, x, y, len(data))
+        1 1 0 26298
+        >>> print(sum(1 for _ in mb.itertiles(zoom=12)))
+        1
+        """
+
+        query = "SELECT zoom_level, tile_column, tile_row, tile_data FROM tiles"
+        where = []
+        args = []
+        if zoom is not None:
+            where.append("zoom_level=?")
+            args.append(zoom)
+
+        if bound is not None:
+            min_y, max_y = bound.min_y, bound.max_y
+            if self.flip_y:
+                min_y, max_y = flip_y_coord(bound.z, max_y), flip_y_coord(bound.z, min_y)
+            where.append("zoom_level=? AND tile_column BETWEEN ? AND ? "
+                         "AND tile_row BETWEEN ? AND ?")
+            args.extend([bound.z, bound.min_x, bound.max_x, min_y, max_y])
+
+        if where:
+            query += " WHERE " + " AND ".join(where)
+
+        cur = self._conn.cursor()
+        # plain tuples are cheaper than sqlite3.Row for bulk reading
+        cur.row_factory = None
+        cur.execute(query, args)
+
+        flip_y = self.flip_y
+        while True:
+            rows = cur.fetchmany(batch_size)
+            if not rows:
+                break
+
+            for z, x, y, data in rows:
+                if flip_y:
+                    y = (2**z-1) - y
+                yield z, x, y, memoryview(data)
+
     def readtiles(self):
-        """Read all tiles saved in mbtile"""
+        """Read all tiles saved in mbtile. Use itertiles() for large files."""
 
         cur = self._conn.cursor()
         cur.execute("SELECT zoom_level, tile_column, tile_row, tile_data FROM tiles;")
@@ -129,16 +499,30 @@ class MBTileFile(object):
         return tiles
 
 
-def open(file, mode="rb", flip_y=True):
+def open(file, mode="rb", flip_y=True, batch_size=WRITE_BATCH_SIZE, dedup=False,
+         trust_bounds=False, immutable=False, mmap_size=None):
     """Wrapper around sqlite3.connect() functions. Returns MBTile file-like object.
 
     Available modes:
     - "rb": open for reading (default)
+    - "wb": open for writing (rewrite file if exist)
+    - "ab": open for appending tiles to existing file
+
+    In write modes tiles are bulk loaded with fast but unsafe pragmas, tiles index and metadata
+    (bounds, center, minzoom, maxzoom, format) are written on close.
 
     Args:
         file (str): path to the file
         mode (str): mode in which the file is opened
         flip_y (bool): flip y coordinate?
+        batch_size (int): count of tiles inserted in one transaction (write modes)
+        dedup (bool): create deduplicated layout ("wb" mode), existing file layout is detected
+            automatically
+        trust_bounds (bool): use bounds, minzoom and maxzoom from metadata instead of
+            calculating tiles bounds
+        immutable (bool): open read-only connection without locking, file must not be changed
+            while it is opened ("rb" mode)
+        mmap_size (int): sqlite mmap_size pragma value in bytes (optional)
 
     >>> from pyosmkit.point import ZXY
     >>> with open("tests/data/0.mbtiles") as mb:
@@ -149,7 +533,7 @@ bounds='108.3703,52.01723,108.4303,52.04723', minzoom=0, maxzoom=17)
     Bound(z:12 x:3281-3281 y:1352-1352)
     """
 
-    return MBTileFile(file, mode, flip_y)
+    return MBTileFile(file, mode, flip_y, batch_size, dedup, trust_bounds, immutable, mmap_size)
 
 
 def flip_y_coord(zoom, y):
@@ -162,3 +546,45 @@ def flip_y_coord(zoom, y):
     """
 
     return (2**zoom-1) - y
+
+
+def _tile_x(z, lng):
+    # fractional tile x of longitude, snapped to the tile edge if lng is its rounded value (as
+    # written by zxy_to_latlong() in metadata), so rounding can't move edge to the next tile
+    x = (lng + 180.0) / 360.0 * 2**z
+    edge = round(x)
+    if zxy_to_latlong(z, edge, 0).long == round(lng, 4):
+        return edge
+
+    return x
+
+
+def _tile_y(z, lat):
+    # fractional tile y of latitude, see _tile_x()
+    lat_rad = math.radians(min(max(lat, -MAX_LAT), MAX_LAT))
+    y = (1.0 - math.log(math.tan(lat_rad) + 1 / math.cos(lat_rad)) / math.pi) / 2.0 * 2**z
+    edge = round(y)
+    if zxy_to_latlong(z, 0, edge).lat == round(lat, 4):
+        return edge
+
+    return y
+
+
+def guess_format(data):
+    """Guess mbtiles format metadata value from tile data (bytes-like).
+
+    >>> guess_format(b"\\x89PNG\\r\\n\\x1a\\n")
+    'png'
+    >>> guess_format(b"\\x1f\\x8b\\x08")
+    'pbf'
+    """
+
+    data = bytes(data[:12])
+    if data.startswith(b"\x89PNG"):
+        return "png"
+    if data.startswith(b"\xff\xd8"):
+        return "jpg"
+    if data.startswith(b"RIFF") and data[8:12] == b"WEBP":
+        return "webp"
+
+    return "pbf"
@@ -0,0 +1,159 @@
+#!/usr/bin/python
+"""Provides thread-safe pool of MBTileFile readers.
+"""
+
+import queue
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+
+from pyosmkit.mbtile.filelike import MBTileFile
+
+# default sqlite mmap_size for pooled connections
+DEFAULT_MMAP_SIZE = 256 * 1024 * 1024
+
+# Stats represents pool checkout statistics: count of checkouts, count of checkouts which waited
+# for free reader, total and maximum wait time in seconds.
+Stats = namedtuple("Stats", "checkouts, waits, wait_time, max_wait_time")
+
+
+class Pool(object):
+    """Pool of read-only MBTileFile readers for one mbtiles file. Every reader owns the immutable
+    sqlite connection, readers are created on demand up to size and share metadata and bounds.
+
+    Args:
+        filename (str): path to the file
+        size (int): maximum count of readers
+        flip_y (bool): flip y coordinate?
+        mmap_size (int): sqlite mmap_size pragma value in bytes
+        timeout (float): default time to wait for free reader in seconds (None - wait forever)
+
+    Attributes:
+        metadata (Metadata): metadata of mbtiles file
+        bounds (Bounds): bounds of mbtiles file
+
+    >>> with Pool("tests/data/0.mbtiles", size=2) as pool:
+    ...     with pool.reader() as mb:
+    ...         print(len(mb.readtile(1, 1, 0)))
+    ...     print(pool.stats().checkouts)
+    26298
+    1
+    """
+
+    def __init__(self, filename, size=4, flip_y=True, mmap_size=DEFAULT_MMAP_SIZE, timeout=None):
+        if size < 1:
+            raise ValueError("pool size must be positive")
+
+        self.filename = filename
+        self.size = size
+        self.flip_y = flip_y
+        self.mmap_size = mmap_size
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        # last returned reader is checked out first, it has the warmest page cache
+        self._idle = queue.LifoQueue()
+        self._readers = []
+        self._checkouts = 0
+        self._waits = 0
+        self._wait_time = 0.0
+        self._max_wait_time = 0.0
+
+        # bounds are calculated before first checkout, reader is not shared between threads
+        reader = self._connect()
+        self.metadata = reader.metadata
+        self.bounds = reader.bounds
+        self._idle.put(reader)
+
+    def _connect(self):
+        reader = MBTileFile(self.filename, "rb", self.flip_y, immutable=True,
+                            mmap_size=self.mmap_size)
+        if self._readers:
+            reader.metadata = self.metadata
+            reader._bounds = self.bounds
+
+        self._readers.append(reader)
+        return reader
+
+    def __str__(self):
+        return str(self.metadata)
+
+    def __contains__(self, item):
+        return item in self.bounds
+
+    # with statement
+    def __enter__(self):
+        return self
+
+    def __exit__(self, type, value, tb):
+        self.close()
+
+    def _checkout(self, timeout):
+        try:
+            return self._idle.get_nowait(), False
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if len(self._readers) < self.size:
+                return self._connect(), False
+
+        try:
+            return self._idle.get(timeout=timeout), True
+        except queue.Empty:
+            raise TimeoutError("no free reader in pool")
+
+    @contextmanager
+    def reader(self, timeout=None):
+        """Check out reader (MBTileFile) for exclusive use inside with statement. Waits for
+        free reader not longer than timeout (float, seconds, default Pool.timeout).
+
+        Raises:
+            TimeoutError
+        """
+
+        if timeout is None:
+            timeout = self.timeout
+
+        start = time.monotonic()
+        reader, waited = self._checkout(timeout)
+        wait_time = time.monotonic() - start
+
+        with self._lock:
+            self._checkouts += 1
+            self._wait_time += wait_time
+            self._max_wait_time = max(self._max_wait_time, wait_time)
+            if waited:
+                self._waits += 1
+
+        try:
+            yield reader
+        finally:
+            self._idle.put(reader)
+
+    def readtile(self, z, x, y):
+        """Read tile data using free reader, see MBTileFile.readtile()."""
+
+        with self.reader() as mb:
+            return mb.readtile(z, x, y)
+
+    def readtiles_many(self, points):
+        """Read many tiles data using free reader, see MBTileFile.readtiles_many()."""
+
+        with self.reader() as mb:
+            return mb.readtiles_many(points)
+
+    def stats(self):
+        """Returns checkout statistics (Stats)."""
+
+        with self._lock:
+            return Stats(self._checkouts, self._waits, self._wait_time, self._max_wait_time)
+
+    def close(self):
+        """Close all readers. Readers must not be checked out."""
+
+        with self._lock:
+            for reader in self._readers:
+                reader.close()
+            self._readers = []
@@ -2,5 +2,7 @@
 """Calculate metatile filepath, read/write metatile.
 """
 
+from pyosmkit.metatile.aio import aopen  # noqa: F401
+from pyosmkit.metatile.cache import Cache  # noqa: F401
 from pyosmkit.metatile.filelike import open  # noqa: F401
 from pyosmkit.metatile.metatile import Metatile, META_SIZE, bound_to_metatiles  # noqa: F401
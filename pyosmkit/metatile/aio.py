@@ -0,0 +1,133 @@
+#!/usr/bin/python
+"""Provides asyncio counterparts of metatile readers. Blocking file operations run in the bounded
+executor (see pyosmkit.aio), so event loop is never blocked by disk access.
+"""
+
+import threading
+
+from pyosmkit.aio import Coalescer, run
+from pyosmkit.metatile.filelike import MetatileFile
+from pyosmkit.point import Point
+
+
+class AsyncMetatileFile(object):
+    """AsyncMetatileFile wraps MetatileFile opened for reading. Header and index are decoded on
+    open, so header, size, index, *in* statement and iterating over points do not block.
+    Concurrent reads are safe: file reads (seek and read) are serialized by the lock, reads from
+    memory-mapped file do not need it.
+
+    Attributes:
+        filename (str): path to the file
+        header (namedtuple Header): metatile header
+        size (int): square root from Header.count
+        index (Index): metatile index
+    """
+
+    def __init__(self, mt, executor=None):
+        self._mt = mt
+        self._executor = executor
+        self.filename = mt.filename
+        self.header = mt.header
+        self.size = mt.size
+        self.index = mt.index
+        self._lock = None if mt.mmap else threading.Lock()
+
+    def __str__(self):
+        return str(self.header)
+
+    def __len__(self):
+        return len(self._mt)
+
+    def __contains__(self, item):
+        return item in self._mt
+
+    def __iter__(self):
+        return iter(self._mt)
+
+    # async with statement
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, type, value, tb):
+        await self.close()
+
+    async def readtile(self, x, y):
+        """See MetatileFile.readtile()."""
+
+        return await run(self._locked, self._mt.readtile, x, y, executor=self._executor)
+
+    async def readtiles(self, points=None):
+        """See MetatileFile.readtiles()."""
+
+        return await run(self._locked, self._mt.readtiles, points, executor=self._executor)
+
+    async def close(self):
+        await run(self._locked, self._mt.close, executor=self._executor)
+
+    def _locked(self, func, *args):
+        # file position is shared between executor threads
+        if self._lock is None:
+            return func(*args)
+
+        with self._lock:
+            return func(*args)
+
+
+async def aopen(file, mmap=False, executor=None):
+    """Opens metatile file for reading in executor. Returns AsyncMetatileFile.
+
+    Args:
+        file (str): path to the file
+        mmap (bool): memory-map file, see pyosmkit.metatile.open()
+        executor (concurrent.futures.Executor): executor for blocking calls (optional)
+
+    >>> import asyncio
+    >>> async def main():
+    ...     async with await aopen("tests/data/0.meta") as mt:
+    ...         data = await mt.readtile(1, 1)
+    ...     return len(data)
+    >>> asyncio.run(main())
+    10439
+    """
+
+    mt = await run(MetatileFile, file, "rb", mmap, executor=executor)
+    return AsyncMetatileFile(mt, executor)
+
+
+class AsyncMetatileReader(object):
+    """AsyncMetatileReader reads tiles from metatile files by path. Concurrent requests for tiles
+    of the same metatile file trigger only one open and read of all tiles.
+
+    Args:
+        executor (concurrent.futures.Executor): executor for blocking calls (optional)
+
+    Attributes:
+        reads (int): count of metatile files reads
+    """
+
+    def __init__(self, executor=None):
+        self._coalescer = Coalescer(executor)
+
+    @property
+    def reads(self):
+        return self._coalescer.calls
+
+    async def readtiles(self, path):
+        """Read all tiles data from metatile file path (str). See MetatileFile.readtiles()."""
+
+        return await self._coalescer.run(path, _readtiles, path)
+
+    async def readtile(self, path, x, y):
+        """Read tile data with x, y (int) coordinates from metatile file path (str).
+
+        Raises:
+            KeyError: if point is not inside metatile
+        """
+
+        tiles = await self.readtiles(path)
+        return tiles[Point(x, y)]
+
+
+def _readtiles(path):
+    with MetatileFile(path, "rb") as mt:
+        return mt.readtiles()
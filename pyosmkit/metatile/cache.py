@@ -0,0 +1,180 @@
+#!/usr/bin/python
+"""Provides LRU cache of decoded metatile indexes and tiles data.
+"""
+
+import os
+import threading
+from collections import OrderedDict, namedtuple
+
+from pyosmkit.metatile.filelike import MetatileFile
+from pyosmkit.point import Point
+
+# Stats represents cache counters: hits (index was not decoded), data_hits (tile was returned
+# without reading file), misses, evictions, count of cached files and size of cached data.
+Stats = namedtuple("Stats", "hits, data_hits, misses, evictions, files, bytes")
+# _Entry represents cached metatile: file stamp (inode, mtime, size), header, index, tiles data
+# (dict or None) and size of tiles data.
+_Entry = namedtuple("_Entry", "stamp, header, index, tiles, size")
+
+
+def _stamp(st):
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def _pread(fd, size, offset):
+    if hasattr(os, "pread"):
+        return os.pread(fd, size, offset)
+
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.read(fd, size)
+
+
+class Cache(object):
+    """Cache keeps recently used metatile headers and indexes (and optionally tiles data) in LRU
+    order. Entries are validated by inode, mtime and size of the file, so re-rendered metatiles
+    are decoded again. Cache is thread-safe.
+
+    Args:
+        max_files (int): maximum count of cached metatiles
+        max_bytes (int): maximum size of cached tiles data, 0 disables tiles data caching
+
+    >>> cache = Cache(max_files=16, max_bytes=1024 * 1024)
+    >>> print(len(cache.readtile("tests/data/0.meta", 1, 1)))
+    10439
+    >>> print(len(cache.readtile("tests/data/0.meta", 1, 0)))
+    26298
+    >>> print(cache.stats())
+    Stats(hits=1, data_hits=1, misses=1, evictions=0, files=1, bytes=73160)
+    """
+
+    def __init__(self, max_files=1024, max_bytes=0):
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._data_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, path):
+        return path in self._entries
+
+    def _get(self, path, stamp):
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is None or entry.stamp != stamp:
+                return None
+
+            self._entries.move_to_end(path)
+            self._hits += 1
+            if entry.tiles is not None:
+                self._data_hits += 1
+            return entry
+
+    def _put(self, path, entry):
+        with self._lock:
+            old = self._entries.pop(path, None)
+            if old is not None:
+                self._bytes -= old.size
+
+            self._entries[path] = entry
+            self._bytes += entry.size
+            self._misses += 1
+
+            while len(self._entries) > self.max_files or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self._evictions += 1
+
+    def _load(self, path):
+        with MetatileFile(path, "rb") as mt:
+            stamp = _stamp(os.fstat(mt._file.fileno()))
+            tiles = None
+            size = 0
+            if self.max_bytes:
+                # cached data is shared between callers, so only read-only views are kept
+                tiles = {p: data.toreadonly() for p, data in mt.readtiles().items()}
+                size = sum(len(data) for data in tiles.values())
+                # too large for cache, keep only index
+                if size > self.max_bytes:
+                    tiles = None
+                    size = 0
+
+        return _Entry(stamp, mt.header, mt.index, tiles, size)
+
+    def header(self, path):
+        """Returns metatile header (namedtuple Header) for file path (str)."""
+
+        return self._entry(path).header
+
+    def index(self, path):
+        """Returns metatile index (Index) for file path (str)."""
+
+        return self._entry(path).index
+
+    def _entry(self, path):
+        entry = self._get(path, _stamp(os.stat(path)))
+        if entry is None:
+            entry = self._load(path)
+            self._put(path, entry)
+
+        return entry
+
+    def readtile(self, path, x, y):
+        """Read tile data with x, y (int) coordinates from metatile file path (str). Returns
+        bytes-like object (read-only memoryview if tiles data is cached).
+
+        Raises:
+            KeyError: if point is not inside metatile
+        """
+
+        point = Point(x, y)
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            stamp = _stamp(os.fstat(fd))
+            entry = self._get(path, stamp)
+            if entry is None:
+                entry = self._load(path)
+                self._put(path, entry)
+
+            if entry.tiles is not None:
+                return entry.tiles[point]
+
+            # index is valid only for the file opened as fd
+            if entry.stamp == stamp:
+                offset, size = entry.index[point]
+                return _pread(fd, size, offset)
+        finally:
+            os.close(fd)
+
+        # file was replaced during loading
+        with MetatileFile(path, "rb") as mt:
+            return mt.readtile(x, y)
+
+    def invalidate(self, path):
+        """Remove cached entry for file path (str)."""
+
+        with self._lock:
+            entry = self._entries.pop(path, None)
+            if entry is not None:
+                self._bytes -= entry.size
+
+    def clear(self):
+        """Remove all cached entries."""
+
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        """Returns cache counters (Stats)."""
+
+        with self._lock:
+            return Stats(self._hits, self._data_hits, self._misses, self._evictions,
+                         len(self._entries), self._bytes)
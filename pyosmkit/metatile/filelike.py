@@ -19,8 +19,13 @@ struct meta_layout {
 """
 
 import math
+import mmap as mmap_
+import os
 import struct
-from collections import OrderedDict, namedtuple
+import threading
+from array import array
+from collections import namedtuple
+from collections.abc import Mapping
 from io import open as builtin_open
 
 from pyosmkit.point import Point
@@ -32,6 +37,66 @@ META_MAGIC = b"META"  # in python3 bytes and str different
 Entry = namedtuple("Entry", "offset size")
 # Header includes metatile struct fields except index[]: magic (bytes), count, x, y, z (int).
 Header = namedtuple("Header", "count x y z")
+# HEADER_STRUCT packs and unpacks header fields: magic, count, x, y, z.
+HEADER_STRUCT = struct.Struct("4s4i")
+# ENTRY_SIZE is the size of the one index[] entry in bytes.
+ENTRY_SIZE = struct.calcsize("2i")
+
+
+class Index(Mapping):
+    """Index is the read-only mapping of Point(x, y) to Entry(offset, size), ordered starting
+    from lowest Point. Entries are stored in the flat array of ints (offset, size, offset, size,
+    ...) exactly as in the file, position of Point is calculated from lowest x, y.
+
+    Attributes:
+        x, y (int): lowest values of the metatile
+        size (int): square root from Header.count
+        entries (array of int): raw offsets and sizes
+    """
+
+    __slots__ = ("x", "y", "size", "entries")
+
+    def __init__(self, x, y, size, entries):
+        self.x = x
+        self.y = y
+        self.size = size
+        self.entries = entries
+
+    def __repr__(self):
+        return "{0}({1})".format(self.__class__.__name__, dict(self))
+
+    def _position(self, point):
+        try:
+            x, y = point
+            dx = x - self.x
+            dy = y - self.y
+        except (TypeError, ValueError):
+            raise KeyError(point)
+
+        if 0 <= dx < self.size and 0 <= dy < self.size:
+            return 2 * (dx * self.size + dy)
+
+        raise KeyError(point)
+
+    def __getitem__(self, point):
+        i = self._position(point)
+        return Entry(self.entries[i], self.entries[i + 1])
+
+    def __contains__(self, point):
+        try:
+            self._position(point)
+        except KeyError:
+            return False
+
+        return True
+
+    def __iter__(self):
+        for x in range(self.x, self.x + self.size):
+            for y in range(self.y, self.y + self.size):
+                yield Point(x, y)
+
+    def __len__(self):
+        return self.size * self.size
 
 
 class MetatileFile(object):
@@ -40,13 +105,15 @@ class MetatileFile(object):
     Attributes:
         filename (str): path to the file
         mode (str): mode in which the file is opened
+        mmap (bool): file is memory-mapped, readtile() returns memoryview slices of the mapping
+        atomic (bool): data is written to the temporary file which is renamed to filename on close
 
     Attributes (only for "rb" mode):
         header (namedtuple Header): metatile header, includes magic (bytes), count, x, y
             (int, lowest values), z (int).
         size (int): square root from Header.count
-        index (OrderedDict): metatile index[], includes offsets from start of the file (int)
-            and sizes (int), represents as OrderedDict starting from lowest Point:
+        index (Index): metatile index[], includes offsets from start of the file (int)
+            and sizes (int), represents as read-only mapping starting from lowest Point:
 
             {
                 Point(x, y): Entry(offset, size)
@@ -57,36 +124,70 @@ class MetatileFile(object):
         IOError
     """
 
-    def __init__(self, filename, mode="rb"):
+    def __init__(self, filename, mode="rb", mmap=False, atomic=False):
         if mode not in ("rb", "wb"):
             raise IOError("mode not supported:", mode)
 
-        self._file = builtin_open(filename, mode)
+        if mmap and mode != "rb":
+            raise IOError("mmap supported only for mode rb")
+
+        if atomic and mode != "wb":
+            raise IOError("atomic supported only for mode wb")
+
         self.filename = filename
+        self.mmap = mmap
+        self.atomic = atomic
+        self._map = None
+        self._view = None
+        self._tmpname = None
+        # streaming write() is started, but header and index are not written yet
+        self._incomplete = False
+
+        if mode == "wb":
+            # writes are unbuffered, write() sends already collected buffers with one syscall
+            if atomic:
+                self._tmpname = "{0}.{1}.{2}.tmp".format(filename, os.getpid(),
+                                                         threading.get_ident())
+            self._file = builtin_open(self._tmpname or filename, mode, buffering=0)
+        else:
+            self._file = builtin_open(filename, mode)
+
+        if mmap:
+            # the mapping stays valid after closing the descriptor, so all further reads are
+            # plain memory accesses
+            with self._file:
+                # empty file can't be mapped, it has no header like any other short file
+                if not os.fstat(self._file.fileno()).st_size:
+                    raise IOError("wrong metatile header")
+                self._map = mmap_.mmap(self._file.fileno(), 0, access=mmap_.ACCESS_READ)
+            self._file = self._map
+            self._view = memoryview(self._map)
 
         if mode == "rb":
-            self.header = self._decode_header()
-            self.size = int(round(math.sqrt(self.header.count)))
-            self.index = self._decode_index()
+            self.header, self.index = self._decode()
+            self.size = self.index.size
 
-    def _decode_header(self):
-        size = len(META_MAGIC) + 4 * 4
-        magic, count, x, y, z = struct.unpack("4s4i", self._file.read(size))
+    def _decode(self):
+        # header and index of the full metatile are read at once, count is checked afterwards
+        length = HEADER_STRUCT.size + ENTRY_SIZE * META_SIZE * META_SIZE
+        data = self._file.read(length)
+        if len(data) < HEADER_STRUCT.size:
+            raise IOError("wrong metatile header")
+
+        magic, count, x, y, z = HEADER_STRUCT.unpack_from(data)
         if magic != META_MAGIC:
             raise IOError("wrong metatile magic header")
 
-        return Header(count, x, y, z)
-
-    def _decode_index(self):
-        index = OrderedDict()
-
-        for x in range(self.header.x, self.header.x + self.size):
-            for y in range(self.header.y, self.header.y + self.size):
-                data = self._file.read(2 * 4)
-                offset, size = struct.unpack("2i", data)
-                index[Point(x, y)] = Entry(offset, size)
+        size = int(round(math.sqrt(count)))
+        length = HEADER_STRUCT.size + ENTRY_SIZE * size * size
+        if len(data) < length:
+            data += self._file.read(length - len(data))
+        if len(data) < length:
+            raise IOError("wrong metatile index")
 
-        return index
+        entries = array("i")
+        entries.frombytes(data[HEADER_STRUCT.size:length])
+        return Header(count, x, y, z), Index(x, y, size, entries)
 
     def __repr__(self):
         return "{0}.{1}({2})".format(self.__class__.__module__, self.__class__.__name__,
@@ -122,6 +223,11 @@ class MetatileFile(object):
     def write(self, x, y, z, data):
         """Writes tiles data to opened metatile file. Use x, y, z (int) as metatile header values.
 
+        If data is the dict, tiles are written in the metatile order with one writev() call.
+        Otherwise data is consumed as stream: every tile is written as soon as it is received,
+        index is written at the end. If stream raises inside with statement, partially written
+        file is removed (with atomic=True target file is not touched at all).
+
         Args:
             x, y (int): lowest values for this metatile
             z (int): zoom level
@@ -132,42 +238,80 @@ class MetatileFile(object):
                     ...
                     (x + count, y + count ): bytes,
                 }
+
+                or iterable (generator) of tuples (x (int), y (int), bytes-like)
+
+        Raises:
+            ValueError: if streamed tile is outside metatile or duplicated
         """
 
-        # write header data
         count = META_SIZE * META_SIZE
-        self._file.write(struct.pack("4s4i", META_MAGIC, count, x, y, z))
         size = int(round(math.sqrt(count)))
-
-        offset = len(META_MAGIC) + 4 * 4
+        header = HEADER_STRUCT.pack(META_MAGIC, count, x, y, z)
+        entries = array("i", [0]) * (2 * count)
         # need to pre-compensate the offsets for the size of the offset/size
         # table we are about to write
-        offset += (2 * 4) * count
-
-        # collect all the tiles offset/sizes
-        index = []
-        size_ = 0
-        for x_ in range(x, x+size):
-            for y_ in range(y, y+size):
-                if (x_, y_) in data:
-                    size_ = len(data[x_, y_])
-                else:
-                    size_ = 0
-                index.append(Entry(offset, size_))
-                offset += size_
-
-        # write out index table
-        for entry in index:
-            self._file.write(struct.pack("2i", entry.offset, entry.size))
-
-        # write out data
-        for x_ in range(x, x+size):
-            for y_ in range(y, y+size):
-                if (x_, y_) in data:
-                    self._file.write(data[(x_, y_)])
+        offset = HEADER_STRUCT.size + ENTRY_SIZE * count
+
+        if isinstance(data, Mapping):
+            tiles = []
+            i = 0
+            for x_ in range(x, x + size):
+                for y_ in range(y, y + size):
+                    tile = data.get((x_, y_))
+                    size_ = len(tile) if tile else 0
+                    entries[i] = offset
+                    entries[i + 1] = size_
+                    offset += size_
+                    i += 2
+                    if size_:
+                        tiles.append(tile)
+
+            self._writeall([header, entries.tobytes()] + tiles)
+            return
+
+        index = Index(x, y, size, entries)
+        seen = set()
+        self._incomplete = True
+        self._file.seek(offset)
+        for x_, y_, tile in data:
+            try:
+                i = index._position((x_, y_))
+            except KeyError:
+                raise ValueError("tile outside metatile: ({0}, {1})".format(x_, y_))
+            if i in seen:
+                raise ValueError("duplicated tile: ({0}, {1})".format(x_, y_))
+            seen.add(i)
+
+            entries[i] = offset
+            entries[i + 1] = len(tile)
+            offset += len(tile)
+            self._writeall([tile])
+
+        # missing tiles are empty and point to the end of data
+        for i in range(0, 2 * count, 2):
+            if i not in seen:
+                entries[i] = offset
+
+        self._file.seek(0)
+        self._writeall([header, entries.tobytes()])
+        self._incomplete = False
+
+    def _writeall(self, buffers):
+        total = sum(len(b) for b in buffers)
+        written = 0
+        if hasattr(os, "writev"):
+            written = os.writev(self._file.fileno(), buffers)
+        if written == total:
+            return
+
+        rest = memoryview(b"".join(buffers))[written:]
+        while rest:
+            rest = rest[self._file.write(rest):]
 
     def readtile(self, x, y):
-        """Read tile data with x, y (int) coordinates from metatile file. Return bytes (str).
+        """Read tile data with x, y (int) coordinates from metatile file. Return bytes (str), or
+        memoryview if file opened with mmap=True.
 
         >>> with open("tests/data/0.meta", "rb") as mt:
         ...     data = mt.readtile(1, 1)
@@ -176,42 +320,112 @@ class MetatileFile(object):
         """
 
         offset, size = self.index[Point(x, y)]
+        if self._view is not None:
+            return self._view[offset:offset + size]
+
         self._file.seek(offset)
         data = self._file.read(size)
 
         return data
 
-    def readtiles(self):
-        """Read all tiles data from metatile file.
+    def readtiles(self, points=None):
+        """Read all tiles data (or only tiles for given points) from metatile file. The byte range
+        covering requested tiles is read with a single call into one buffer, tiles are returned as
+        memoryview slices of this buffer (or of the mapping if file opened with mmap=True).
+
+        Args:
+            points (list of Point or tuple (x, y)): read only these tiles (optional, default all)
 
         Returns: dict with tuple (x, y) as key and tile data as value of length Header.count:
             {
-                Point(x, y): bytes (str),
+                Point(x, y): memoryview,
                 ...
             }
 
+        Raises:
+            KeyError: if point is not inside metatile
+
         >>> with open("tests/data/0.meta", "rb") as mt:
         ...     data = mt.readtiles()
         ...     tile = data[(1, 1)]
         ...     print(len(tile))
         10439
+        >>> with open("tests/data/0.meta", "rb") as mt:
+        ...     data = mt.readtiles(points=[(1, 1), (0, 1)])
+        ...     print(sorted(data))
+        [Point(x=0, y=1), Point(x=1, y=1)]
         """
 
+        if points is None:
+            points = list(self.index)
+        else:
+            points = [Point(*p) for p in points]
+        entries = [self.index[p] for p in points]
+
+        start = 0
+        if self._view is not None:
+            view = self._view
+        else:
+            sizes = [e for e in entries if e.size]
+            if sizes:
+                start = min(e.offset for e in sizes)
+                end = max(e.offset + e.size for e in sizes)
+            else:
+                end = start
+
+            buf = bytearray(end - start)
+            if buf:
+                self._file.seek(start)
+                if self._file.readinto(buf) != len(buf):
+                    raise IOError("unexpected end of metatile file")
+            view = memoryview(buf)
+
         data = {}
-        for p in self.index:
-            data[p] = self.readtile(p.x, p.y)
+        for p, (offset, size) in zip(points, entries):
+            if size:
+                data[p] = view[offset - start:offset - start + size]
+            else:
+                data[p] = view[0:0]
 
         return data
 
     def close(self):
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+            try:
+                self._map.close()
+            except BufferError:
+                # tile memoryviews are still alive, mapping is released with the last of them
+                pass
+            return
+
+        self._file.close()
+        if self._tmpname is not None:
+            os.replace(self._tmpname, self.filename)
+            self._tmpname = None
+
+    def _discard(self):
         self._file.close()
+        if self._tmpname is not None:
+            os.remove(self._tmpname)
+            self._tmpname = None
+        elif self._incomplete:
+            os.remove(self.filename)
+            self._incomplete = False
 
     # with statement
     def __enter__(self):
         return self
 
     def __exit__(self, type, value, tb):
-        self._file.close()
+        # do not replace target file with partially written data, do not leave metatile
+        # without header and index
+        if type is not None and (self._tmpname is not None or self._incomplete):
+            self._discard()
+            return
+
+        self.close()
 
     # iteratate over metadata
     def __iter__(self):
@@ -226,7 +440,7 @@ class MetatileFile(object):
         return next(self)
 
 
-def open(file, mode="rb"):
+def open(file, mode="rb", mmap=False, atomic=False):
     """Is the wrapper around builtin open() function. Returns Metatile file-like object.
 
     Available modes:
@@ -236,10 +450,17 @@ def open(file, mode="rb"):
     Args:
         file (str): path to the file
         mode (str): mode in which the file is opened
+        mmap (bool): memory-map file (only for "rb" mode), tiles are returned as memoryview
+            slices of the mapping without copying
+        atomic (bool): write to the temporary file and rename it to file on close (only for "wb"
+            mode), readers never see partially written metatile
 
     >>> with open("tests/data/0.meta") as mt:
     ...     print(mt)
     Header(count=64, x=0, y=0, z=1)
+    >>> with open("tests/data/0.meta", mmap=True) as mt:
+    ...     print(len(mt.readtile(1, 1)))
+    10439
     """
 
-    return MetatileFile(file, mode)
+    return MetatileFile(file, mode, mmap, atomic)
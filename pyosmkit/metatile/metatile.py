@@ -6,8 +6,14 @@ https://github.com/openstreetmap/mod_tile
 
 import os.path
 import re
+from array import array
 
-from pyosmkit.point import Point
+from pyosmkit.point import Point, ZXY
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 # metatile size
 META_SIZE = 8
@@ -19,23 +25,46 @@ META_URL_RE = re.compile(r"(\w+)/(\d+)/(\d+)/(\d+)/(\d+)/(\d+)/(\d+)\.meta")
 class Metatile(object):
     """Attributes:
         z, x, y (int): zoom coordinate
+        max_x, max_y (int): maximum coordinates of tiles with data
         hashes (list of 5 int): metatile hashes
         style (str): style name
         ext (str): metatile extension (".meta")
+
+    x, y, max_x, max_y are calculated from hashes on first access.
     """
 
+    __slots__ = ("z", "hashes", "style", "ext", "_xy")
+
     def __init__(self, z, hashes, style):
         self.z = z
         self.hashes = hashes
         self.style = style
         self.ext = META_EXT
-        self.x, self.y = hashes_to_xy(hashes)
-        self.max_x = self.x + len(self) - 1
-        self.max_y = self.y + len(self) - 1
+        self._xy = None
+
+    @property
+    def x(self):
+        if self._xy is None:
+            self._xy = hashes_to_xy(self.hashes)
+        return self._xy.x
+
+    @property
+    def y(self):
+        if self._xy is None:
+            self._xy = hashes_to_xy(self.hashes)
+        return self._xy.y
+
+    @property
+    def max_x(self):
+        return self.x + len(self) - 1
+
+    @property
+    def max_y(self):
+        return self.y + len(self) - 1
 
     def __str__(self):
-        return "Metatile(z:{z}, x:{x}-{max_x}, y:{y}-{max_y}, style:{style})".format(
-            **self.__dict__)
+        return "Metatile(z:{0}, x:{1}-{2}, y:{3}-{4}, style:{5})".format(
+            self.z, self.x, self.max_x, self.y, self.max_y, self.style)
 
     def points(self):
         """Returns list of all points inside metatile."""
@@ -119,6 +148,9 @@ class Metatile(object):
         False
         """
 
+        if not isinstance(metatile, Metatile):
+            return NotImplemented
+
         if self.style != metatile.style:
             return False
 
@@ -133,6 +165,9 @@ class Metatile(object):
 
         return True
 
+    def __hash__(self):
+        return hash((self.style, self.z, self.x, self.y))
+
     @classmethod
     def from_url(cls, url):
         """Creates new Metatile from metatile url (str with format style/z/h0/h1/h2/h3/h4.meta).
@@ -168,14 +203,11 @@ def hashes_to_xy(hashes):
     """Calculates metatile x, y (int) coordinates from hashes (list of 5 ints). Returns Point(x, y).
     """
 
-    x = 0
-    y = 0
-
-    for i in range(5):
-        x <<= 4
-        y <<= 4
-        x |= (hashes[i] & 0xf0) >> 4
-        y |= (hashes[i] & 0x0f)
+    h0, h1, h2, h3, h4 = hashes
+    x = (((h0 & 0xf0) << 12) | ((h1 & 0xf0) << 8) | ((h2 & 0xf0) << 4) | (h3 & 0xf0) |
+         ((h4 & 0xf0) >> 4))
+    y = (((h0 & 0x0f) << 16) | ((h1 & 0x0f) << 12) | ((h2 & 0x0f) << 8) | ((h3 & 0x0f) << 4) |
+         (h4 & 0x0f))
 
     return Point(x, y)
 
@@ -183,21 +215,100 @@ def hashes_to_xy(hashes):
 def xy_to_hashes(x, y):
     """Calculates metatile hashes (list of 5 ints) from x, y (int) coordinates."""
 
-    hashes = []
     x = x & ~(META_SIZE - 1)
     y = y & ~(META_SIZE - 1)
 
-    for _ in range(5):
-        hashes.append(((x & 0x0f) << 4) | (y & 0x0f))
-        x >>= 4
-        y >>= 4
-    hashes.reverse()
+    return [((x >> 12) & 0xf0) | ((y >> 16) & 0x0f),
+            ((x >> 8) & 0xf0) | ((y >> 12) & 0x0f),
+            ((x >> 4) & 0xf0) | ((y >> 8) & 0x0f),
+            (x & 0xf0) | ((y >> 4) & 0x0f),
+            ((x << 4) & 0xf0) | (y & 0x0f)]
 
-    return hashes
 
+def xy_to_hashes_many(xs, ys):
+    """Vectorized xy_to_hashes(). Takes sequences (lists, arrays, buffers) of x, y coordinates.
+    Returns list of 5 hashes columns (h0 ... h4) as numpy uint8 arrays, or array('B') if numpy is
+    not installed.
 
-def bound_to_metatiles(bound, style=""):
-    """Split bound (pyosmkit.point.Bound) to list of pyosmkit.metatile.Metatile. Returns iterator.
+    >>> [[int(h) for h in column] for column in xy_to_hashes_many([697, 0], [321, 0])]
+    [[0, 0], [0, 0], [33, 0], [180, 0], [128, 0]]
+    """
+
+    if numpy is None:
+        return _xy_to_hashes_many(xs, ys)
+
+    x = numpy.asarray(xs, dtype=numpy.int64) & ~(META_SIZE - 1)
+    y = numpy.asarray(ys, dtype=numpy.int64) & ~(META_SIZE - 1)
+    return [((((x >> shift) & 0x0f) << 4) | ((y >> shift) & 0x0f)).astype(numpy.uint8)
+            for shift in (16, 12, 8, 4, 0)]
+
+
+def _xy_to_hashes_many(xs, ys):
+    columns = [array("B") for _ in range(5)]
+    for x, y in zip(xs, ys):
+        for column, h in zip(columns, xy_to_hashes(x, y)):
+            column.append(h)
+
+    return columns
+
+
+def hashes_to_xy_many(hashes):
+    """Vectorized hashes_to_xy(). Takes 5 hashes columns (h0 ... h4, sequences of int). Returns
+    pair (xs, ys) of numpy int64 arrays, or array('q') if numpy is not installed.
+
+    >>> xs, ys = hashes_to_xy_many([[0, 0], [0, 0], [33, 0], [180, 0], [128, 0]])
+    >>> [int(v) for v in xs], [int(v) for v in ys]
+    ([696, 0], [320, 0])
+    """
+
+    if numpy is None:
+        return _hashes_to_xy_many(hashes)
+
+    x = numpy.zeros(len(hashes[0]), dtype=numpy.int64)
+    y = numpy.zeros(len(hashes[0]), dtype=numpy.int64)
+    for column in hashes:
+        h = numpy.asarray(column, dtype=numpy.int64)
+        x = (x << 4) | ((h & 0xf0) >> 4)
+        y = (y << 4) | (h & 0x0f)
+
+    return x, y
+
+
+def _hashes_to_xy_many(hashes):
+    xs = array("q")
+    ys = array("q")
+    for row in zip(*hashes):
+        x, y = hashes_to_xy(row)
+        xs.append(x)
+        ys.append(y)
+
+    return xs, ys
+
+
+def metatile_paths_many(z, xs, ys, style="", basedir=""):
+    """Calculates filepaths of metatiles with z (int) coordinate and x, y coordinates (sequences
+    of int) using style (str) and basedir (str). Returns list of str.
+
+    >>> metatile_paths_many(10, [697, 0], [321, 0], "mapname", "/cache")
+    ['/cache/mapname/10/0/0/33/180/128.meta', '/cache/mapname/10/0/0/0/0/0.meta']
+    """
+
+    columns = xy_to_hashes_many(xs, ys)
+    if numpy is not None:
+        columns = [column.tolist() for column in columns]
+
+    fmt = os.path.join(basedir, style, str(z), "").replace("{", "{{").replace("}", "}}")
+    fmt += "{0}/{1}/{2}/{3}/{4}" + META_EXT
+    return [fmt.format(*row) for row in zip(*columns)]
+
+
+def bound_to_metatiles(bound, style="", output="metatiles", basedir=""):
+    """Split bound (pyosmkit.point.Bound) to metatiles. Returns iterator. Output of iterator
+    depends on output (str):
+
+    - "metatiles": pyosmkit.metatile.Metatile objects
+    - "records": ZXY(z, x, y) of top left tile of metatile
+    - "paths": metatiles filepaths (str) with style and basedir (str)
 
     >>> from pyosmkit.point import Bound
     >>> bound = Bound(z=10, min_x=692, min_y=318, max_x=703, max_y=324)
@@ -208,13 +319,34 @@ def bound_to_metatiles(bound, style=""):
     Metatile(z:10, x:688-695, y:320-327, style:mapname)
     Metatile(z:10, x:696-703, y:312-319, style:mapname)
     Metatile(z:10, x:696-703, y:320-327, style:mapname)
+    >>> list(bound_to_metatiles(bound, output="records"))[:2]
+    [ZXY(z=10, x=688, y=312), ZXY(z=10, x=688, y=320)]
+    >>> list(bound_to_metatiles(bound, style="mapname", output="paths"))[0]
+    'mapname/10/0/0/33/179/8.meta'
+
+    Raises:
+        ValueError: if output is unknown
     """
 
-    mt_start = Metatile(z=bound.z, hashes=xy_to_hashes(x=bound.min_x, y=bound.min_y), style=style)
-    mt_end = Metatile(z=bound.z, hashes=xy_to_hashes(x=bound.max_x, y=bound.max_y), style=style)
+    if output not in ("metatiles", "records", "paths"):
+        raise ValueError("unknown output: {0}".format(output))
+
+    return _bound_to_metatiles(bound, style, output, basedir)
+
+
+def _bound_to_metatiles(bound, style, output, basedir):
+    z = bound.z
+    mask = ~(META_SIZE - 1)
+    ys = range(bound.min_y & mask, (bound.max_y & mask) + 1, META_SIZE)
 
-    for x in range(mt_start.x, mt_end.x + 1, META_SIZE):
-        for y in range(mt_start.y, mt_end.y + 1, META_SIZE):
-            hashes = xy_to_hashes(x, y)
-            metatile = Metatile(z=bound.z, hashes=hashes, style=style)
-            yield metatile
+    for x in range(bound.min_x & mask, (bound.max_x & mask) + 1, META_SIZE):
+        if output == "paths":
+            yield from metatile_paths_many(z, [x] * len(ys), ys, style, basedir)
+        elif output == "records":
+            for y in ys:
+                yield ZXY(z, x, y)
+        else:
+            for y in ys:
+                metatile = Metatile(z=z, hashes=xy_to_hashes(x, y), style=style)
+                metatile._xy = Point(x, y)
+                yield metatile
@@ -0,0 +1,127 @@
+#!/usr/bin/python
+"""Provides fast batch conversion of filepaths between tiles and metatiles.
+"""
+
+import os.path
+
+from pyosmkit.metatile.metatile import META_EXT, META_SIZE, Metatile, hashes_to_xy, xy_to_hashes
+from pyosmkit.tile import Tile
+
+
+def parse_tile_path(path):
+    """Parses tile path (str with format [prefix/]style/z/x/y.ext) without regex. Returns tuple
+    (style, z, x, y, ext) or None if path has other format (use Tile.from_url() for it).
+
+    >>> parse_tile_path("/cache/mapname/10/697/321.png")
+    ('mapname', 10, 697, 321, '.png')
+    >>> print(parse_tile_path("mapname/10/697/321"))
+    None
+    """
+
+    parts = path.rsplit("/", 4)
+    if len(parts) < 4 or (len(parts) == 5 and "." in parts[0]):
+        return None
+
+    style, z, x, tail = parts[-4:]
+    y, dot, ext = tail.partition(".")
+    if not (dot and _is_word(style) and _is_word(ext) and z.isdecimal() and x.isdecimal() and
+            y.isdecimal()):
+        return None
+
+    return style, int(z), int(x), int(y), "." + ext
+
+
+def parse_metatile_path(path):
+    """Parses metatile path (str with format [prefix/]style/z/h0/h1/h2/h3/h4.meta) without regex.
+    Returns tuple (style, z, hashes) or None if path has other format (use Metatile.from_url() for
+    it).
+
+    >>> parse_metatile_path("/cache/mapname/10/0/0/33/180/128.meta")
+    ('mapname', 10, [0, 0, 33, 180, 128])
+    """
+
+    if not path.endswith(META_EXT):
+        return None
+
+    parts = path[:-len(META_EXT)].rsplit("/", 7)
+    if len(parts) < 7 or (len(parts) == 8 and "." in parts[0]):
+        return None
+
+    style, z = parts[-7:-5]
+    hashes = parts[-5:]
+    if not (_is_word(style) and z.isdecimal() and all(h.isdecimal() for h in hashes)):
+        return None
+
+    return style, int(z), [int(h) for h in hashes]
+
+
+def _is_word(s):
+    # the same as regex \w+
+    return s != "" and (s.isalnum() or s.replace("_", "a").isalnum())
+
+
+def convert_many(paths, ext=".png", basedir="", unique=True):
+    """Converts iterable of tile filepaths (str) to metatile filepaths and metatile filepaths to
+    tile filepaths (like osmtool_convert_path). Returns generator of filepaths.
+
+    Args:
+        paths: iterable of str, eg "style/1/1/1.png" or "style/1/0/0/0/0/0.meta"
+        ext (str): extension of output tiles
+        basedir (str): output basedir prefix
+        unique (bool): skip already returned filepaths (64 tiles are converted to one metatile)
+
+    Raises:
+        ValueError: if path can not be converted
+
+    >>> paths = ["mapname/10/697/321.png", "mapname/10/696/320.png",
+    ...          "mapname/10/0/0/33/180/128.meta"]
+    >>> for p in convert_many(paths, basedir="/cache"):
+    ...     print(p)
+    /cache/mapname/10/0/0/33/180/128.meta
+    /cache/mapname/10/696/320.png
+    """
+
+    # style, z -> output prefix
+    prefixes = {}
+    seen = set()
+    mask = ~(META_SIZE - 1)
+
+    for path in paths:
+        if path.endswith(META_EXT):
+            parsed = parse_metatile_path(path)
+            if parsed is None:
+                mt = Metatile.from_url(path)
+                parsed = mt.style, mt.z, mt.hashes
+
+            style, z, hashes = parsed
+            key = style, z, tuple(hashes)
+            if unique:
+                if key in seen:
+                    continue
+                seen.add(key)
+
+            x, y = hashes_to_xy(hashes)
+            prefix = prefixes.get((style, z))
+            if prefix is None:
+                prefix = prefixes[style, z] = os.path.join(basedir, style, str(z), "")
+            yield "{0}{1}/{2}{3}".format(prefix, x, y, ext)
+            continue
+
+        parsed = parse_tile_path(path)
+        if parsed is None:
+            t = Tile.from_url(path)
+            parsed = t.style, t.z, t.x, t.y, t.ext
+
+        style, z, x, y, _ = parsed
+        x &= mask
+        y &= mask
+        if unique:
+            key = style, z, x, y
+            if key in seen:
+                continue
+            seen.add(key)
+
+        prefix = prefixes.get((style, z))
+        if prefix is None:
+            prefix = prefixes[style, z] = os.path.join(basedir, style, str(z), "")
+        yield "{0}{1}/{2}/{3}/{4}/{5}{6}".format(prefix, *xy_to_hashes(x, y) + [META_EXT])
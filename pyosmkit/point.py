@@ -3,7 +3,14 @@
 """
 
 import math
+from array import array
 from collections import namedtuple
+from collections.abc import Sequence
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 # Point represents point with x, y (int) coordinates.
 Point = namedtuple("Point", "x, y")
@@ -43,6 +50,85 @@ def latlong_to_zxy(lat, lng, zoom):
     return ZXY(zoom, x, y)
 
 
+def zxy_to_latlong_many(z, xs, ys):
+    """Vectorized zxy_to_latlong(). Takes z (int or sequence of int) and sequences (lists, arrays,
+    buffers) of x, y coordinates. Returns pair (lats, longs) of numpy arrays, or array('d') if
+    numpy is not installed. Values are rounded to 4 digits with numpy.round().
+
+    >>> lats, longs = zxy_to_latlong_many(10, [697, 0], [321, 0])
+    >>> [float(v) for v in lats], [float(v) for v in longs]
+    ([55.5783, 85.0511], [65.0391, -180.0])
+    """
+
+    if numpy is None:
+        return _zxy_to_latlong_many(z, xs, ys)
+
+    n = 2.0 ** numpy.asarray(z, dtype=numpy.float64)
+    x = numpy.asarray(xs, dtype=numpy.float64)
+    y = numpy.asarray(ys, dtype=numpy.float64)
+    lon_deg = x / n * 360.0 - 180.0
+    lat_deg = numpy.degrees(numpy.arctan(numpy.sinh(numpy.pi * (1 - 2 * y / n))))
+    return numpy.round(lat_deg, 4), numpy.round(lon_deg, 4)
+
+
+def _zxy_to_latlong_many(z, xs, ys):
+    zs = _broadcast(z, len(xs))
+    lats = array("d")
+    longs = array("d")
+    for z_, x, y in zip(zs, xs, ys):
+        ll = zxy_to_latlong(z_, x, y)
+        lats.append(ll.lat)
+        longs.append(ll.long)
+
+    return lats, longs
+
+
+def latlong_to_zxy_many(lats, lngs, zoom):
+    """Vectorized latlong_to_zxy(). Takes sequences (lists, arrays, buffers) of lat, lng and zoom
+    (int or sequence of int). Returns pair (xs, ys) of numpy int64 arrays, or array('q') if numpy
+    is not installed.
+
+    >>> xs, ys = latlong_to_zxy_many([55.5783, 52.03223], [65.0391, 108.4003], 10)
+    >>> [int(v) for v in xs], [int(v) for v in ys]
+    ([697, 820], [321, 338])
+    """
+
+    if numpy is None:
+        return _latlong_to_zxy_many(lats, lngs, zoom)
+
+    lat_rad = numpy.radians(numpy.asarray(lats, dtype=numpy.float64))
+    lng = numpy.asarray(lngs, dtype=numpy.float64)
+    n = 2.0 ** numpy.asarray(zoom, dtype=numpy.float64)
+    x = (lng + 180.0) / 360.0 * n
+    with numpy.errstate(divide="ignore", invalid="ignore"):
+        y = ((1.0 - numpy.log(numpy.tan(lat_rad) + (1 / numpy.cos(lat_rad))) / numpy.pi) / 2.0 * n)
+    # int() raises for the same values in latlong_to_zxy()
+    if not (numpy.isfinite(x).all() and numpy.isfinite(y).all()):
+        raise ValueError("math domain error")
+
+    # astype() truncates toward zero like int()
+    return x.astype(numpy.int64), y.astype(numpy.int64)
+
+
+def _latlong_to_zxy_many(lats, lngs, zoom):
+    zooms = _broadcast(zoom, len(lats))
+    xs = array("q")
+    ys = array("q")
+    for lat, lng, z in zip(lats, lngs, zooms):
+        p = latlong_to_zxy(lat, lng, z)
+        xs.append(p.x)
+        ys.append(p.y)
+
+    return xs, ys
+
+
+def _broadcast(value, length):
+    if isinstance(value, int):
+        return [value] * length
+
+    return value
+
+
 def str_to_range(s, delim=":", output=float):
     """Converts string `s` like "S1:S2" to pair (S1, S2) (S1 and S2 has type `output`).
 
@@ -79,6 +165,8 @@ class Bound(object):
         min_y, max_y (int): minimum and maximym y coordinates
     """
 
+    __slots__ = ("z", "min_x", "max_x", "min_y", "max_y")
+
     def __init__(self, z, min_x, max_x, min_y, max_y):
         self.z = z
         self.min_x = min_x
@@ -90,7 +178,28 @@ class Bound(object):
         return self.__str__()
 
     def __str__(self):
-        return "Bound(z:{z} x:{min_x}-{max_x} y:{min_y}-{max_y})".format(**self.__dict__)
+        return "Bound(z:{0} x:{1}-{2} y:{3}-{4})".format(self.z, self.min_x, self.max_x,
+                                                         self.min_y, self.max_y)
+
+    def _key(self):
+        return self.z, self.min_x, self.max_x, self.min_y, self.max_y
+
+    def __eq__(self, other):
+        """Returns True if other (Bound) has the same coordinates.
+
+        >>> Bound(1, 0, 1, 0, 1) == Bound(1, 0, 1, 0, 1)
+        True
+        >>> len({Bound(1, 0, 1, 0, 1), Bound(1, 0, 1, 0, 1), Bound(1, 0, 1, 0, 0)})
+        2
+        """
+
+        if not isinstance(other, Bound):
+            return NotImplemented
+
+        return self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
 
     def __contains__(self, item):
         """Returns True if item (point.ZXY) contains inside Bound.
@@ -119,18 +228,19 @@ class Bound(object):
         return True
 
     def points(self):
-        """Returns generator of ZXY points inside Bound.
+        """Returns lazy sequence (ZXYRange) of ZXY points inside Bound.
 
         >>> bound = Bound(z=4, min_x=9, max_x=10, min_y=6, max_y=6)
         >>> for b in bound.points():
         ...     print(b)
         ZXY(z=4, x=9, y=6)
         ZXY(z=4, x=10, y=6)
+        >>> len(bound.points())
+        2
         """
 
-        for x in range(self.min_x, self.max_x + 1):
-            for y in range(self.min_y, self.max_y + 1):
-                yield ZXY(z=self.z, x=x, y=y)
+        return ZXYRange(z=self.z, min_x=self.min_x, max_x=self.max_x,
+                        min_y=self.min_y, max_y=self.max_y)
 
     @classmethod
     def from_latlong_bound(cls, b):
@@ -147,8 +257,94 @@ class Bound(object):
         return cls(z=b.z, min_x=p_start.x, max_x=p_end.x, min_y=p_start.y, max_y=p_end.y)
 
 
+class ZXYRange(Sequence):
+    """Lazy sequence of ZXY points inside square bound, ordered like Bound.points() (x changes
+    slowest). Points are calculated from position, so len(), indexing, slicing and *in* statement
+    take O(1) time and memory.
+
+    Args:
+        z (int): zoom level
+        min_x, max_x (int): minimum and maximum x coordinates
+        min_y, max_y (int): minimum and maximym y coordinates
+        positions (range): positions of points in full bound (optional, used for slicing)
+
+    >>> r = ZXYRange(z=4, min_x=9, max_x=10, min_y=5, max_y=7)
+    >>> r[4]
+    ZXY(z=4, x=10, y=6)
+    >>> list(r[1:6:2])
+    [ZXY(z=4, x=9, y=6), ZXY(z=4, x=10, y=5), ZXY(z=4, x=10, y=7)]
+    >>> ZXY(z=4, x=10, y=7) in r[1:6:2], ZXY(z=4, x=10, y=6) in r[1:6:2]
+    (True, False)
+    """
+
+    def __init__(self, z, min_x, max_x, min_y, max_y, positions=None):
+        self.z = z
+        self.min_x = min_x
+        self.max_x = max_x
+        self.min_y = min_y
+        self.max_y = max_y
+        self._height = max(max_y - min_y + 1, 0)
+        if positions is None:
+            positions = range(max(max_x - min_x + 1, 0) * self._height)
+        self._positions = positions
+
+    def __repr__(self):
+        return "ZXYRange(z:{0} x:{1}-{2} y:{3}-{4} {5})".format(
+            self.z, self.min_x, self.max_x, self.min_y, self.max_y, self._positions)
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return ZXYRange(self.z, self.min_x, self.max_x, self.min_y, self.max_y,
+                            self._positions[i])
+
+        x, y = divmod(self._positions[i], self._height)
+        return ZXY(self.z, self.min_x + x, self.min_y + y)
+
+    def __iter__(self):
+        z, min_x, min_y, height = self.z, self.min_x, self.min_y, self._height
+        for i in self._positions:
+            x, y = divmod(i, height)
+            yield ZXY(z, min_x + x, min_y + y)
+
+    def __contains__(self, item):
+        try:
+            z, x, y = item
+        except (TypeError, ValueError):
+            return False
+
+        if z != self.z or not (self.min_x <= x <= self.max_x and self.min_y <= y <= self.max_y):
+            return False
+
+        return (x - self.min_x) * self._height + (y - self.min_y) in self._positions
+
+    def chunks(self, size=65536):
+        """Returns generator of points as column blocks (xs, ys) of at most size points. Blocks
+        are numpy int64 arrays, or array('q') if numpy is not installed.
+
+        >>> for xs, ys in ZXYRange(z=4, min_x=9, max_x=10, min_y=5, max_y=6).chunks(3):
+        ...     print([int(x) for x in xs], [int(y) for y in ys])
+        [9, 9, 10] [5, 6, 5]
+        [10] [6]
+        """
+
+        height = self._height
+        for start in range(0, len(self._positions), size):
+            positions = self._positions[start:start + size]
+            if numpy is not None:
+                xs, ys = numpy.divmod(numpy.arange(positions.start, positions.stop,
+                                                   positions.step, dtype=numpy.int64), height)
+                yield xs + self.min_x, ys + self.min_y
+            else:
+                yield (array("q", [self.min_x + i // height for i in positions]),
+                       array("q", [self.min_y + i % height for i in positions]))
+
+
 class Bounds(object):
-    """Represends a list of Bound.
+    """Represends a list of Bound. Bounds are indexed by zoom, overlapping and adjacent bounds
+    which form a square are merged on append, so a zoom usually has only one Bound.
     """
 
     def __init__(self, bounds):
@@ -156,7 +352,10 @@ class Bounds(object):
             bounds: list of Bound
         """
 
-        self.bounds = bounds
+        self.bounds = []
+        self._zooms = {}
+        for bound in bounds:
+            self.append(bound)
 
     def __repr__(self):
         return self.__str__()
@@ -169,11 +368,24 @@ class Bounds(object):
         not exist in Bounds.
         """
 
-        for bound in self.bounds:
-            if bound.z == z:
-                return bound
+        rects = self._zooms.get(z)
+        if not rects:
+            raise ValueError("bound for given zoom not found")
+
+        return rects[0]
+
+    def for_zoom_all(self, z):
+        """Return list of all disjoint or overlapping bounds for given z (int).
 
-        raise ValueError("bound for given zoom not found")
+        >>> bounds = Bounds([Bound(z=1, min_x=0, max_x=0, min_y=0, max_y=0),
+        ...                  Bound(z=1, min_x=1, max_x=1, min_y=1, max_y=1)])
+        >>> bounds.for_zoom_all(1)
+        [Bound(z:1 x:0-0 y:0-0), Bound(z:1 x:1-1 y:1-1)]
+        >>> bounds.for_zoom_all(2)
+        []
+        """
+
+        return list(self._zooms.get(z, ()))
 
     def __contains__(self, item):
         """Returns True if item (point.ZXY) inside Bounds.
@@ -194,12 +406,32 @@ class Bounds(object):
         Bound(z:15 x:26248-26253 y:10816-10821)
         """
 
-        for bound in self.bounds:
-            if item in bound:
+        for bound in self._zooms.get(item.z, ()):
+            if bound.min_x <= item.x <= bound.max_x and bound.min_y <= item.y <= bound.max_y:
                 return True
 
         return False
 
+    def contains_many(self, points):
+        """Returns list of bool: True for every point (point.ZXY or tuple (z, x, y)) inside Bounds.
+
+        >>> bounds = Bounds([Bound(z=1, min_x=0, max_x=1, min_y=1, max_y=1)])
+        >>> bounds.contains_many([(1, 0, 1), (1, 0, 0), (2, 0, 1)])
+        [True, False, False]
+        """
+
+        zooms = self._zooms
+        result = []
+        for z, x, y in points:
+            inside = False
+            for bound in zooms.get(z, ()):
+                if bound.min_x <= x <= bound.max_x and bound.min_y <= y <= bound.max_y:
+                    inside = True
+                    break
+            result.append(inside)
+
+        return result
+
     def __iter__(self):
         return iter(self.bounds)
 
@@ -210,8 +442,36 @@ class Bounds(object):
         return next(self)
 
     def append(self, bound):
-        """Append bound (Bound) to Bounds."""
+        """Append bound (Bound) to Bounds. Bound is skipped if it is inside existing bound, or
+        merged with existing bounds if their union is square.
+
+        >>> bounds = Bounds([Bound(z=1, min_x=0, max_x=0, min_y=0, max_y=1)])
+        >>> bounds.append(Bound(z=1, min_x=1, max_x=1, min_y=0, max_y=1))
+        >>> bounds.append(Bound(z=1, min_x=0, max_x=1, min_y=1, max_y=1))
+        >>> print(bounds)
+        [Bound(z:1 x:0-1 y:0-1)]
+        """
 
+        rects = self._zooms.setdefault(bound.z, [])
+        merged = True
+        while merged:
+            merged = False
+            for rect in rects:
+                if _covers(rect, bound):
+                    return
+
+                if _covers(bound, rect) or _mergeable(rect, bound):
+                    rects.remove(rect)
+                    self.bounds.remove(rect)
+                    bound = Bound(z=bound.z,
+                                  min_x=min(rect.min_x, bound.min_x),
+                                  max_x=max(rect.max_x, bound.max_x),
+                                  min_y=min(rect.min_y, bound.min_y),
+                                  max_y=max(rect.max_y, bound.max_y))
+                    merged = True
+                    break
+
+        rects.append(bound)
         self.bounds.append(bound)
 
     def points(self):
@@ -221,6 +481,37 @@ class Bounds(object):
             for point in bound.points():
                 yield point
 
+    def count(self):
+        """Returns count of ZXY points inside Bounds."""
+
+        return sum(len(bound.points()) for bound in self.bounds)
+
+    def chunks(self, size=65536):
+        """Returns generator of points inside Bounds as column blocks (z (int), xs, ys) of at most
+        size points, see ZXYRange.chunks().
+        """
+
+        for bound in self.bounds:
+            for xs, ys in bound.points().chunks(size):
+                yield bound.z, xs, ys
+
+
+def _covers(a, b):
+    # True if bound a contains whole bound b
+    return (a.min_x <= b.min_x and b.max_x <= a.max_x and
+            a.min_y <= b.min_y and b.max_y <= a.max_y)
+
+
+def _mergeable(a, b):
+    # True if union of overlapping or adjacent bounds a and b is square
+    if a.min_x == b.min_x and a.max_x == b.max_x:
+        return a.min_y <= b.max_y + 1 and b.min_y <= a.max_y + 1
+
+    if a.min_y == b.min_y and a.max_y == b.max_y:
+        return a.min_x <= b.max_x + 1 and b.min_x <= a.max_x + 1
+
+    return False
+
 
 class LatLongBound(object):
     """Represents square bound of LatLongs.
@@ -232,6 +523,8 @@ class LatLongBound(object):
         end_ll (LatLong): end point of bound
     """
 
+    __slots__ = ("z", "start_ll", "end_ll")
+
     def __init__(self, z, lat1, lat2, lng1, lng2):
         """
         >>> ll_bound = LatLongBound(10, 55.6992, 55.2031, 64.9662, 66.3121)
@@ -251,4 +544,4 @@ class LatLongBound(object):
         self.end_ll = LatLong(lat=end_lat, long=end_lng)
 
     def __str__(self):
-        return "LatLongBound(z:{z} {start_ll}-{end_ll}".format(**self.__dict__)
+        return "LatLongBound(z:{0} {1}-{2}".format(self.z, self.start_ll, self.end_ll)
@@ -5,3 +5,5 @@ point inside this polygon or not (using ray-casting algorithm).
 
 from pyosmkit.polygon.polygon import Polygon  # noqa: F401
 from pyosmkit.polygon.region import Region  # noqa: F401
+from pyosmkit.polygon.coverage import coverage  # noqa: F401
+from pyosmkit.polygon.loader import load_geojson, load_poly, read_geojson, read_poly  # noqa: F401
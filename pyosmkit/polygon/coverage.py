@@ -0,0 +1,137 @@
+#!/usr/bin/python
+"""Provides coverage of Polygon or Region by tiles and metatiles. Tiles are found by quadtree
+subdivision: every quad is classified as inside, outside or partial using only polygon edges
+which intersect the parent quad, so quads without edges are classified by one point test and
+their children are not tested at all.
+"""
+
+import math
+
+from pyosmkit.metatile.metatile import META_SIZE
+from pyosmkit.point import ZXY
+from pyosmkit.polygon.polygon import Polygon
+
+# zoom difference between metatile and the quad with the same size
+META_SHIFT = int(math.log2(META_SIZE))
+
+
+def tile_lat(z, y):
+    """Returns latitude (float) of the top edge of tiles row y (int) with zoom z (int). Unlike
+    pyosmkit.point.zxy_to_latlong() value is not rounded.
+
+    >>> round(tile_lat(10, 321), 4)
+    55.5783
+    """
+
+    return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / 2.0 ** z))))
+
+
+def tile_long(z, x):
+    """Returns longitude (float) of the left edge of tiles column x (int) with zoom z (int). Unlike
+    pyosmkit.point.zxy_to_latlong() value is not rounded.
+
+    >>> tile_long(10, 697)
+    65.0390625
+    """
+
+    return x / 2.0 ** z * 360.0 - 180.0
+
+
+def coverage(shape, min_zoom, max_zoom, metatiles=False):
+    """Calculates tiles (or metatiles) with zooms from min_zoom to max_zoom (int) which intersect
+    shape (pyosmkit.polygon.Polygon or pyosmkit.polygon.Region). Returns generator of ZXY in
+    depth-first order. If metatiles is True, ZXY are coordinates of top left tiles of
+    metatiles (like bound_to_metatiles(..., output="records")).
+
+    >>> from pyosmkit.point import LatLong
+    >>> polygon = Polygon([LatLong(55.4903, 65.2110), LatLong(55.4066, 65.2275),
+    ...                    LatLong(55.4329, 65.3573), LatLong(55.4969, 65.3878),
+    ...                    LatLong(55.5169, 65.3113)])
+    >>> tiles = sorted(coverage(polygon, 12, 12))
+    >>> len(tiles), tiles[0], tiles[-1]
+    (8, ZXY(z=12, x=2789, y=1285), ZXY(z=12, x=2791, y=1287))
+    >>> list(coverage(polygon, 12, 13, metatiles=True))
+    [ZXY(z=12, x=2784, y=1280), ZXY(z=13, x=5576, y=2568)]
+    """
+
+    shift = META_SHIFT if metatiles else 0
+    edges = _edges(shape)
+    if not edges[0]:
+        return
+
+    def level(z):
+        # zoom of the quad with the size of tile (metatile) with zoom z
+        return max(z - shift, 0)
+
+    zooms = range(min_zoom, max_zoom + 1)
+    max_level = level(max_zoom)
+    stack = [(0, 0, 0, range(len(edges[0])))]
+    while stack:
+        q, qx, qy, candidates = stack.pop()
+        rect = tile_lat(q, qy + 1), tile_long(q, qx), tile_lat(q, qy), tile_long(q, qx + 1)
+        crossing = [e for e in candidates if _intersects(edges, e, rect)]
+
+        if not crossing:
+            center = (rect[0] + rect[2]) / 2, (rect[1] + rect[3]) / 2
+            if center in shape:
+                # all children are inside
+                for z in zooms:
+                    d = level(z) - q
+                    if d < 0:
+                        continue
+                    s = z - level(z)
+                    for x in range(qx << d, (qx + 1) << d):
+                        for y in range(qy << d, (qy + 1) << d):
+                            yield ZXY(z, x << s, y << s)
+            continue
+
+        for z in zooms:
+            if level(z) == q:
+                s = z - q
+                yield ZXY(z, qx << s, qy << s)
+
+        if q < max_level:
+            for x, y in ((1, 1), (1, 0), (0, 1), (0, 0)):
+                stack.append((q + 1, (qx << 1) + x, (qy << 1) + y, crossing))
+
+
+def _edges(shape):
+    polygons = [shape] if isinstance(shape, Polygon) else shape._polygons
+    lat1, lng1, lat2, lng2 = [], [], [], []
+    for polygon in polygons:
+        for lats, longs in polygon._rings:
+            n = len(lats)
+            for i in range(n):
+                lat1.append(lats[i - 1])
+                lng1.append(longs[i - 1])
+                lat2.append(lats[i])
+                lng2.append(longs[i])
+
+    return lat1, lng1, lat2, lng2
+
+
+def _intersects(edges, e, rect):
+    # checks if edge e intersects (or touches) rect (min_lat, min_long, max_lat, max_long)
+    lat1, lng1, lat2, lng2 = edges[0][e], edges[1][e], edges[2][e], edges[3][e]
+    min_lat, min_long, max_lat, max_long = rect
+
+    if (lat1 < min_lat and lat2 < min_lat) or (lat1 > max_lat and lat2 > max_lat):
+        return False
+    if (lng1 < min_long and lng2 < min_long) or (lng1 > max_long and lng2 > max_long):
+        return False
+
+    # all corners of rect are on the same side of the edge line
+    dlat = lat2 - lat1
+    dlng = lng2 - lng1
+    positive = negative = False
+    for lat, lng in ((min_lat, min_long), (min_lat, max_long), (max_lat, min_long),
+                     (max_lat, max_long)):
+        side = dlat * (lng - lng1) - dlng * (lat - lat1)
+        if side > 0:
+            positive = True
+        elif side < 0:
+            negative = True
+        else:
+            return True
+
+    return positive and negative
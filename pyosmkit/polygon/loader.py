@@ -0,0 +1,149 @@
+#!/usr/bin/python
+"""Provides loaders of polygons from Osmosis .poly files
+(https://wiki.openstreetmap.org/wiki/Osmosis/Polygon_Filter_File_Format) and GeoJSON
+(Polygon, MultiPolygon, Feature, FeatureCollection, GeometryCollection). Coordinates are parsed
+directly to arrays, Polygon objects are created with Polygon.from_arrays().
+"""
+
+import json
+from array import array
+
+from pyosmkit.polygon.polygon import Polygon
+from pyosmkit.polygon.region import Region
+
+
+def read_poly(lines):
+    """Parses lines (iterable of str, eg file object) of Osmosis .poly file. Sections with names
+    started with "!" are holes, every hole is added to the first outer ring which contains it.
+    Returns Region.
+
+    Raises:
+        ValueError: if lines have other format
+
+    >>> lines = ["area", "1", " 0.0E+00 0.0E+00", " 10 0", " 10 10", " 0 10", "END",
+    ...          "!1_hole", " 4 4", " 6 4", " 6 6", " 4 6", "END", "END"]
+    >>> region = read_poly(lines)
+    >>> len(region), (1, 2) in region, (5, 5) in region
+    (1, True, False)
+    """
+
+    outers = []
+    holes = []
+    ring = None
+    lines = iter(lines)
+
+    # the first line is the name of file
+    if next(lines, None) is None:
+        raise ValueError("empty poly file")
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        if ring is None:
+            if line == "END":
+                break
+            ring = array("d"), array("d")
+            (holes if line.startswith("!") else outers).append(ring)
+            continue
+
+        if line == "END":
+            ring = None
+            continue
+
+        # longitude goes first
+        lng, lat = line.split()
+        ring[0].append(float(lat))
+        ring[1].append(float(lng))
+    else:
+        raise ValueError("unexpected end of poly file")
+
+    return _region(outers, [[] for _ in outers], holes)
+
+
+def load_poly(filename):
+    """Loads Osmosis .poly file filename (str). Returns Region, see read_poly()."""
+
+    with open(filename) as f:
+        return read_poly(f)
+
+
+def read_geojson(obj):
+    """Creates Region from parsed GeoJSON obj (dict). Geometries other than Polygon and
+    MultiPolygon are skipped. Returns Region.
+
+    Raises:
+        ValueError: if obj has unknown type
+
+    >>> obj = {"type": "Feature", "properties": {}, "geometry": {"type": "MultiPolygon",
+    ...        "coordinates": [[[[0, 0], [0, 10], [10, 10], [10, 0], [0, 0]],
+    ...                         [[4, 4], [4, 6], [6, 6], [6, 4], [4, 4]]],
+    ...                        [[[20, 20], [20, 21], [21, 21], [20, 20]]]]}}
+    >>> region = read_geojson(obj)
+    >>> len(region), (1, 2) in region, (5, 5) in region, (20.8, 20.5) in region
+    (2, True, False, True)
+    """
+
+    outers = []
+    holes = []
+    for polygon in _geojson_polygons(obj):
+        if not polygon:
+            continue
+
+        rings = [_ring(coordinates) for coordinates in polygon]
+        outers.append(rings[0])
+        holes.append(rings[1:])
+
+    return _region(outers, holes, [])
+
+
+def load_geojson(filename):
+    """Loads GeoJSON file filename (str). Returns Region, see read_geojson()."""
+
+    with open(filename) as f:
+        return read_geojson(json.load(f))
+
+
+def _geojson_polygons(obj):
+    # yields lists of rings coordinates
+    kind = obj.get("type")
+    if kind == "FeatureCollection":
+        for feature in obj["features"]:
+            yield from _geojson_polygons(feature)
+    elif kind == "Feature":
+        if obj.get("geometry"):
+            yield from _geojson_polygons(obj["geometry"])
+    elif kind == "GeometryCollection":
+        for geometry in obj["geometries"]:
+            yield from _geojson_polygons(geometry)
+    elif kind == "Polygon":
+        yield obj["coordinates"]
+    elif kind == "MultiPolygon":
+        yield from obj["coordinates"]
+    elif kind in ("Point", "MultiPoint", "LineString", "MultiLineString"):
+        return
+    else:
+        raise ValueError("unknown GeoJSON type: {0}".format(kind))
+
+
+def _ring(coordinates):
+    # GeoJSON positions are [longitude, latitude, ...]
+    lats = array("d", (c[1] for c in coordinates))
+    longs = array("d", (c[0] for c in coordinates))
+    return lats, longs
+
+
+def _region(outers, holes, free_holes):
+    # free holes are added to the first outer ring which contains their first point
+    rings = [Polygon.from_arrays(lats, longs) for lats, longs in outers] if free_holes else []
+    for hole in free_holes:
+        if not len(hole[0]):
+            continue
+
+        for i, ring in enumerate(rings):
+            if (hole[0][0], hole[1][0]) in ring:
+                holes[i].append(hole)
+                break
+
+    return Region([Polygon.from_arrays(lats, longs, h) for (lats, longs), h in zip(outers, holes)])
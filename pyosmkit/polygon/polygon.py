@@ -2,33 +2,220 @@
 """Provides Polygon object.
 """
 
+from array import array
 
-from pyosmkit.polygon import raycasting
+from pyosmkit.point import LatLong
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# average count of edges in one longitude band
+BAND_EDGES = 16
+MAX_BANDS = 65536
+# maximum size of points x edges matrix in contains_many()
+CHUNK_ELEMENTS = 1 << 20
 
 
 class Polygon(object):
-    """Polygon contains a list of LatLong points.
+    """Polygon contains a list of LatLong points (outer ring) and optional holes (list of lists of
+    LatLong points). Polygon is prepared on creation: rings are closed, edges are stored in flat
+    arrays with precomputed slopes and grouped by longitude bands, so *in* statement checks only
+    edges which can be crossed by the ray (using ray-casting algorithm, see
+    pyosmkit.polygon.raycasting). Points outside of bounding box are rejected immediately.
+
+    Attributes:
+        bbox (tuple): (min_lat, min_long, max_lat, max_long) of outer ring, None if polygon has
+            less than 3 points
+
+    >>> from pyosmkit.point import LatLong
+    >>> polygon = Polygon([LatLong(0, 0), LatLong(10, 0), LatLong(10, 10), LatLong(0, 10)],
+    ...                   holes=[[LatLong(4, 4), LatLong(6, 4), LatLong(6, 6), LatLong(4, 6)]])
+    >>> LatLong(1, 2) in polygon, LatLong(5, 5) in polygon, LatLong(11, 12) in polygon
+    (True, False, False)
     """
 
-    def __init__(self, points):
+    def __init__(self, points, holes=None):
         self._points = points
+        lats = array("d", (p[0] for p in points))
+        longs = array("d", (p[1] for p in points))
+        holes = [(array("d", (p[0] for p in hole)), array("d", (p[1] for p in hole)))
+                 for hole in holes or []]
+        self._prepare(lats, longs, holes)
+
+    @classmethod
+    def from_arrays(cls, lats, longs, holes=None):
+        """Creates new Polygon from outer ring coordinates lats, longs (array('d')) and holes (list
+        of pairs (lats, longs)) without intermediate LatLong points. Arrays are not copied.
+
+        >>> from array import array
+        >>> polygon = Polygon.from_arrays(array("d", [0, 10, 10, 0]), array("d", [0, 0, 10, 10]))
+        >>> (5, 5) in polygon, len(polygon)
+        (True, 4)
+        """
+
+        polygon = cls.__new__(cls)
+        polygon._points = None
+        polygon._prepare(lats, longs, holes or [])
+        return polygon
+
+    def _prepare(self, lats, longs, holes):
+        self._lats = lats
+        self._longs = longs
+        self.bbox = None
+        # rings (outer and holes) as pairs of lats, longs arrays
+        self._rings = []
+
+        # edges: latitude of start point, longitude of start and end points, slope
+        self._a_lat = array("d")
+        self._a_long = array("d")
+        self._b_long = array("d")
+        self._slope = array("d")
+        self._bands = []
+        self._band_scale = 0.0
+        # numpy copies of edges arrays for contains_many()
+        self._np_edges = None
+
+        # too few points for polygon
+        if len(lats) < 3:
+            return
+
+        self.bbox = min(lats), min(longs), max(lats), max(longs)
+
+        self._add_ring(lats, longs)
+        for hole_lats, hole_longs in holes:
+            self._add_ring(hole_lats, hole_longs)
+
+        self._build_bands()
+
+    def _add_ring(self, lats, longs):
+        n = len(lats)
+        if n < 3:
+            return
+
+        self._rings.append((lats, longs))
+
+        # ring is closed by the edge from last to first point (zero length if already closed)
+        prev_lat, prev_long = lats[n - 1], longs[n - 1]
+        for i in range(n):
+            lat, lng = lats[i], longs[i]
+            # horizontal edges can't be crossed by the ray
+            if lng != prev_long:
+                self._a_lat.append(prev_lat)
+                self._a_long.append(prev_long)
+                self._b_long.append(lng)
+                self._slope.append((lat - prev_lat) / (lng - prev_long))
+            prev_lat, prev_long = lat, lng
+
+    def _build_bands(self):
+        min_long, max_long = self.bbox[1], self.bbox[3]
+        count = max(1, min(len(self._slope) // BAND_EDGES, MAX_BANDS))
+        if max_long > min_long:
+            self._band_scale = count / (max_long - min_long)
+        else:
+            count = 1
+
+        self._bands = [array("i") for _ in range(count)]
+        for e, (a, b) in enumerate(zip(self._a_long, self._b_long)):
+            lo, hi = (a, b) if a < b else (b, a)
+            first = self._band(lo)
+            last = self._band(hi)
+            for band in self._bands[first:last + 1]:
+                band.append(e)
+
+    def _band(self, lng):
+        i = int((lng - self.bbox[1]) * self._band_scale)
+        if i < 0:
+            return 0
+        if i >= len(self._bands):
+            return len(self._bands) - 1
+        return i
 
     def __str__(self):
+        if self._points is None:
+            return "{0}".format([LatLong(lat, lng) for lat, lng in zip(self._lats, self._longs)])
         return "{0}".format(self._points)
 
     def __len__(self):
-        return len(self._points)
+        return len(self._lats)
 
     def __contains__(self, item):
         """Returns True if LatLong item inside polygon.
         """
 
-        # too few points for polygon
-        if len(self) < 3:
+        if self.bbox is None:
             return False
 
-        # if polygon is not closed, add last point to the start
-        if self._points[0] != self._points[-1]:
-            self._points.insert(0, self._points[-1])
+        lat, lng = item[0], item[1]
+        min_lat, min_long, max_lat, max_long = self.bbox
+        # no edges can be crossed outside of bounding box
+        if lat < min_lat or lat > max_lat or lng < min_long or lng > max_long:
+            return False
+
+        a_lat, a_long, b_long, slope = self._a_lat, self._a_long, self._b_long, self._slope
+        inside = False
+        for e in self._bands[self._band(lng)]:
+            a = a_long[e]
+            if (a > lng) != (b_long[e] > lng) and lat < slope[e] * (lng - a) + a_lat[e]:
+                inside = not inside
+
+        return inside
+
+    def contains_many(self, lats, longs):
+        """Vectorized *in* statement. Takes sequences (lists, arrays, buffers) of lat, long
+        coordinates. Returns mask of points inside polygon: numpy bool array, or array('b') if numpy
+        is not installed. Results are identical to *in* statement: points are grouped by longitude
+        bands and tested against edges of their band with numpy broadcasting in chunks of
+        CHUNK_ELEMENTS.
+
+        >>> from pyosmkit.point import LatLong
+        >>> polygon = Polygon([LatLong(0, 0), LatLong(10, 0), LatLong(10, 10), LatLong(0, 10)])
+        >>> [bool(v) for v in polygon.contains_many([1, 11, 5], [2, 12, 5])]
+        [True, False, True]
+        """
+
+        if numpy is None:
+            return array("b", ((lat, lng) in self for lat, lng in zip(lats, longs)))
+
+        lat = numpy.asarray(lats, dtype=numpy.float64)
+        lng = numpy.asarray(longs, dtype=numpy.float64)
+        mask = numpy.zeros(len(lat), dtype=bool)
+        if self.bbox is None:
+            return mask
+
+        min_lat, min_long, max_lat, max_long = self.bbox
+        candidates = numpy.nonzero((lat >= min_lat) & (lat <= max_lat) &
+                                   (lng >= min_long) & (lng <= max_long))[0]
+        if not len(candidates):
+            return mask
+
+        if self._np_edges is None:
+            self._np_edges = tuple(numpy.frombuffer(a, dtype=numpy.float64)
+                                   for a in (self._a_lat, self._a_long, self._b_long, self._slope))
+        a_lat, a_long, b_long, slope = self._np_edges
+
+        # the same band calculation as in _band()
+        bands = ((lng[candidates] - min_long) * self._band_scale).astype(numpy.int64)
+        numpy.clip(bands, 0, len(self._bands) - 1, out=bands)
+        order = numpy.argsort(bands, kind="stable")
+        candidates = candidates[order]
+        bands = bands[order]
+        starts = numpy.flatnonzero(numpy.diff(bands)) + 1
+        starts = numpy.concatenate(([0], starts, [len(bands)]))
+
+        for start, end in zip(starts[:-1].tolist(), starts[1:].tolist()):
+            edges = numpy.frombuffer(self._bands[bands[start]], dtype=numpy.int32)
+            if not len(edges):
+                continue
+
+            e_lat, e_a, e_b, e_slope = a_lat[edges], a_long[edges], b_long[edges], slope[edges]
+            step = max(1, CHUNK_ELEMENTS // len(edges))
+            for i in range(start, end, step):
+                idx = candidates[i:min(i + step, end)]
+                p_lat = lat[idx][:, None]
+                p_lng = lng[idx][:, None]
+                cross = ((e_a > p_lng) != (e_b > p_lng)) & (p_lat < e_slope * (p_lng - e_a) + e_lat)
+                mask[idx] = numpy.count_nonzero(cross, axis=1) & 1
 
-        return raycasting.is_point_inside(item, self._points)
+        return mask
@@ -2,12 +2,73 @@
 """Provides Region object.
 """
 
+import math
+from array import array
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# average count of polygons in one grid cell
+CELL_POLYGONS = 4
+MAX_GRID_SIZE = 1024
+
 
 class Region(object):
-    """Region contains a list of pyosmkit.polygon.Polygon."""
+    """Region contains a list of pyosmkit.polygon.Polygon. Bounding boxes of polygons are indexed
+    by uniform grid, so lookups test only polygons whose bounding box covers the grid cell of
+    the point.
+
+    >>> from pyosmkit.point import LatLong
+    >>> from pyosmkit.polygon import Polygon
+    >>> square = Polygon([LatLong(0, 0), LatLong(10, 0), LatLong(10, 10), LatLong(0, 10)])
+    >>> island = Polygon([LatLong(20, 20), LatLong(21, 20), LatLong(21, 21), LatLong(20, 21)])
+    >>> region = Region([square, island])
+    >>> region.which(LatLong(20.5, 20.5)), region.which(LatLong(15, 15))
+    (1, None)
+    """
 
     def __init__(self, polygons):
         self._polygons = polygons
+        # region bounding box (min_lat, min_long, max_lat, max_long) and grid of polygons indexes
+        self._bbox = None
+        self._grid = []
+        self._rows = self._cols = 0
+        self._lat_scale = self._long_scale = 0.0
+        self._build_grid()
+
+    def _build_grid(self):
+        boxes = [(i, p.bbox) for i, p in enumerate(self._polygons) if p.bbox is not None]
+        if not boxes:
+            return
+
+        self._bbox = (min(b[0] for _, b in boxes), min(b[1] for _, b in boxes),
+                      max(b[2] for _, b in boxes), max(b[3] for _, b in boxes))
+        min_lat, min_long, max_lat, max_long = self._bbox
+
+        size = max(1, min(int(math.sqrt(len(boxes) / CELL_POLYGONS)) + 1, MAX_GRID_SIZE))
+        self._rows = size if max_lat > min_lat else 1
+        self._cols = size if max_long > min_long else 1
+        if max_lat > min_lat:
+            self._lat_scale = self._rows / (max_lat - min_lat)
+        if max_long > min_long:
+            self._long_scale = self._cols / (max_long - min_long)
+
+        # polygons are appended in region order, so lookups keep the first matching polygon
+        self._grid = [array("i") for _ in range(self._rows * self._cols)]
+        for i, (lat1, lng1, lat2, lng2) in boxes:
+            row1, col1 = self._cell(lat1, lng1)
+            row2, col2 = self._cell(lat2, lng2)
+            for row in range(row1, row2 + 1):
+                for cell in self._grid[row * self._cols + col1:row * self._cols + col2 + 1]:
+                    cell.append(i)
+
+    def _cell(self, lat, lng):
+        row = int((lat - self._bbox[0]) * self._lat_scale)
+        col = int((lng - self._bbox[1]) * self._long_scale)
+        return min(max(row, 0), self._rows - 1), min(max(col, 0), self._cols - 1)
 
     def __len__(self):
         return len(self._polygons)
@@ -19,8 +80,71 @@ class Region(object):
         """Returns True if LatLong item inside region.
         """
 
-        for polygon in self._polygons:
-            if item in polygon:
-                return True
+        return self.which(item) is not None
+
+    def which(self, item):
+        """Returns index (int) of the first polygon which contains LatLong item, or None if item is
+        outside of region.
+        """
+
+        if self._bbox is None:
+            return None
+
+        lat, lng = item[0], item[1]
+        min_lat, min_long, max_lat, max_long = self._bbox
+        if lat < min_lat or lat > max_lat or lng < min_long or lng > max_long:
+            return None
+
+        row, col = self._cell(lat, lng)
+        for i in self._grid[row * self._cols + col]:
+            if item in self._polygons[i]:
+                return i
+
+        return None
+
+    def contains_many(self, lats, longs):
+        """Vectorized *in* statement, see Polygon.contains_many(). Points are grouped by grid
+        cells and tested only against polygons of their cell. Returns mask of points inside any
+        polygon of region: numpy bool array, or array('b') if numpy is not installed.
+        """
+
+        if numpy is None:
+            return array("b", ((lat, lng) in self for lat, lng in zip(lats, longs)))
+
+        lat = numpy.asarray(lats, dtype=numpy.float64)
+        lng = numpy.asarray(longs, dtype=numpy.float64)
+        mask = numpy.zeros(len(lat), dtype=bool)
+        if self._bbox is None:
+            return mask
+
+        min_lat, min_long, max_lat, max_long = self._bbox
+        candidates = numpy.flatnonzero((lat >= min_lat) & (lat <= max_lat) &
+                                       (lng >= min_long) & (lng <= max_long))
+        if not len(candidates):
+            return mask
+
+        # the same cell calculation as in _cell()
+        rows = ((lat[candidates] - min_lat) * self._lat_scale).astype(numpy.int64)
+        cols = ((lng[candidates] - min_long) * self._long_scale).astype(numpy.int64)
+        numpy.clip(rows, 0, self._rows - 1, out=rows)
+        numpy.clip(cols, 0, self._cols - 1, out=cols)
+        cells = rows * self._cols + cols
+
+        order = numpy.argsort(cells, kind="stable")
+        candidates = candidates[order]
+        cells = cells[order]
+        starts = numpy.flatnonzero(numpy.diff(cells)) + 1
+        starts = numpy.concatenate(([0], starts, [len(cells)]))
+
+        for start, end in zip(starts[:-1].tolist(), starts[1:].tolist()):
+            rest = candidates[start:end]
+            for i in self._grid[int(cells[start])]:
+                # points inside previous polygons are not tested again
+                inside = numpy.asarray(self._polygons[i].contains_many(lat[rest], lng[rest]),
+                                       dtype=bool)
+                mask[rest[inside]] = True
+                rest = rest[~inside]
+                if not len(rest):
+                    break
 
-        return False
+        return mask
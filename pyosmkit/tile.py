@@ -16,6 +16,8 @@ class Tile(object):
         ext (str): tile file extension (optional, default=".png")
     """
 
+    __slots__ = ("z", "x", "y", "ext", "style")
+
     def __init__(self, z, x, y, style="", ext=".png"):
         self.z = z
         self.x = x
@@ -24,7 +26,28 @@ class Tile(object):
         self.style = style
 
     def __str__(self):
-        return "Tile(z:{z}, x:{x}, y:{y}, style:{style}, ext:{ext})".format(**self.__dict__)
+        return "Tile(z:{0}, x:{1}, y:{2}, style:{3}, ext:{4})".format(self.z, self.x, self.y,
+                                                                      self.style, self.ext)
+
+    def _key(self):
+        return self.z, self.x, self.y, self.style, self.ext
+
+    def __eq__(self, other):
+        """Returns True if other (Tile) has the same coordinates, style and extension.
+
+        >>> Tile(1, 2, 3, "mapname") == Tile(1, 2, 3, "mapname")
+        True
+        >>> len({Tile(1, 2, 3), Tile(1, 2, 3), Tile(1, 2, 3, ext=".mvt")})
+        2
+        """
+
+        if not isinstance(other, Tile):
+            return NotImplemented
+
+        return self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
 
     def filepath(self, basedir=""):
         """Calculates tile filepath using basedir (str).
@@ -21,6 +21,10 @@ setup(
         "Programming Language :: Python :: 3",
     ],
     packages=find_packages(),
+    extras_require={
+        "numpy": ["numpy"],
+    },
     scripts=["bin/osmtool_convert_path", "bin/osmtool_unpack_metatile",
-             "bin/osmtool_convert_latlong", "bin/osmtool_unpack_mbtile"],
+             "bin/osmtool_convert_latlong", "bin/osmtool_unpack_mbtile",
+             "bin/osmtool_expire"],
 )
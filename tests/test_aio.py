@@ -0,0 +1,183 @@
+#!/usr/bin/python
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import context  # noqa: F401
+import pyosmkit.mbtile
+import pyosmkit.metatile
+from pyosmkit.aio import Coalescer
+from pyosmkit.metatile.aio import AsyncMetatileReader
+from data.index_table import test_index, test_file
+
+
+def test_coalescer_shares_call():
+    calls = []
+
+    def func(x):
+        calls.append(x)
+        return x * 2
+
+    async def main():
+        coalescer = Coalescer()
+        results = await asyncio.gather(*[coalescer.run("key", func, 21) for _ in range(10)])
+        return results, coalescer
+
+    results, coalescer = asyncio.run(main())
+    assert results == [42] * 10
+    assert calls == [21]
+    assert coalescer.calls == 1 and len(coalescer) == 0
+
+
+def test_coalescer_shares_exception():
+    def func():
+        raise ValueError("boom")
+
+    async def main():
+        coalescer = Coalescer()
+        return await asyncio.gather(coalescer.run("key", func), coalescer.run("key", func),
+                                    return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, ValueError) for r in results)
+
+
+def test_metatile_aopen():
+    async def main():
+        async with await pyosmkit.metatile.aopen(test_file, mmap=True) as mt:
+            assert (1, 0) in mt
+            tile = await mt.readtile(1, 0)
+            tiles = await mt.readtiles()
+            return len(tile), len(tiles)
+
+    assert asyncio.run(main()) == (test_index[(1, 0)].size, 64)
+
+
+@pytest.mark.parametrize("mmap", [False, True])
+def test_metatile_aopen_concurrent_reads(mmap):
+    with pyosmkit.metatile.open(test_file) as mt:
+        expected = {p: bytes(mt.readtile(*p)) for p in test_index}
+
+    async def main():
+        async with await pyosmkit.metatile.aopen(test_file, mmap=mmap) as mt:
+            for _ in range(50):
+                points = list(test_index)
+                tiles, many = await asyncio.gather(
+                    asyncio.gather(*[mt.readtile(*p) for p in points]),
+                    asyncio.gather(*[mt.readtiles(points[i:i + 2])
+                                     for i in range(0, len(points), 2)]))
+                assert {p: bytes(t) for p, t in zip(points, tiles)} == expected
+                for chunk in many:
+                    assert {p: bytes(t) for p, t in chunk.items()} == \
+                        {p: expected[p] for p in chunk}
+
+    asyncio.run(main())
+
+
+def test_metatile_reader_coalescing():
+    async def main():
+        reader = AsyncMetatileReader()
+        tiles = await asyncio.gather(*[reader.readtile(test_file, x, y) for x, y in test_index])
+        return tiles, reader.reads
+
+    tiles, reads = asyncio.run(main())
+    assert [len(t) for t in tiles] == [e.size for e in test_index.values()]
+    assert reads == 1
+
+
+def test_metatile_reader_outside():
+    with pytest.raises(KeyError):
+        asyncio.run(AsyncMetatileReader().readtile(test_file, 10, 10))
+
+
+def test_mbtile_aopen():
+    async def main():
+        async with await pyosmkit.mbtile.aopen("tests/data/0.mbtiles", size=2) as mb:
+            points = [tuple(p) for p in mb.bounds.for_zoom(15).points()]
+            tiles = await asyncio.gather(*[mb.readtile(*p) for p in points])
+            many = await mb.readtiles_many(points)
+            streamed = {}
+            async for z, x, y, data in mb.itertiles(zoom=15, batch_size=5):
+                streamed[(z, x, y)] = bytes(data)
+            return points, tiles, many, streamed
+
+    points, tiles, many, streamed = asyncio.run(main())
+    assert tiles == many
+    assert streamed == dict(zip(points, tiles))
+
+
+def test_mbtile_itertiles_does_not_starve_executor():
+    executor = ThreadPoolExecutor(2)
+
+    async def main():
+        async with await pyosmkit.mbtile.aopen("tests/data/0.mbtiles", size=1,
+                                               executor=executor) as mb:
+            async def iterate():
+                count = 0
+                async for _ in mb.itertiles(zoom=15, batch_size=1):
+                    count += 1
+                    await asyncio.sleep(0.01)
+                return count
+
+            iterating = asyncio.ensure_future(iterate())
+            await asyncio.sleep(0.02)
+            z, x, y = next(iter(mb.bounds.for_zoom(15).points()))
+            tiles = await asyncio.gather(mb.readtile(1, 1, 0), mb.readtile(z, x, y))
+            return await iterating, tiles
+
+    try:
+        count, tiles = asyncio.run(asyncio.wait_for(main(), 10))
+    finally:
+        executor.shutdown(wait=False)
+
+    assert count == 36
+    assert len(tiles[0]) == 26298
+
+
+def test_mbtile_itertiles_cancel(monkeypatch):
+    next_batch = pyosmkit.mbtile.aio._next_batch
+    started = threading.Event()
+    finish = threading.Event()
+    idle = []
+
+    async def main():
+        async with await pyosmkit.mbtile.aopen("tests/data/0.mbtiles", size=1) as mb:
+            def slow_batch(tiles, size):
+                started.set()
+                finish.wait(5)
+                # reader must not be returned to pool while batch is running
+                idle.append(mb._pool._idle.qsize())
+                return next_batch(tiles, size)
+
+            async def iterate():
+                async for _ in mb.itertiles(zoom=15):
+                    pass
+
+            monkeypatch.setattr(pyosmkit.mbtile.aio, "_next_batch", slow_batch)
+            task = asyncio.ensure_future(iterate())
+            await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+            task.cancel()
+            await asyncio.sleep(0.05)
+            finish.set()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return len(await mb.readtile(1, 1, 0))
+
+    assert asyncio.run(asyncio.wait_for(main(), 10)) == 26298
+    assert idle == [0]
+
+
+def test_mbtile_timeout():
+    async def main():
+        async with await pyosmkit.mbtile.aopen("tests/data/0.mbtiles", size=1,
+                                               timeout=0.05) as mb:
+            async for _ in mb.itertiles(zoom=15):
+                with pytest.raises(TimeoutError):
+                    await mb.readtile(1, 1, 0)
+                break
+            assert len(await mb.readtile(1, 1, 0)) == 26298
+
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+#!/usr/bin/python
+
+import math
+import random
+
+import pytest
+
+import context  # noqa: F401
+from pyosmkit.point import LatLong, ZXY, latlong_to_zxy
+from pyosmkit.polygon import Polygon, Region
+from pyosmkit.polygon.coverage import _edges, _intersects, coverage, tile_lat, tile_long
+
+REAL_POLYGON = Polygon([LatLong(55.4903, 65.2110), LatLong(55.4066, 65.2275),
+                        LatLong(55.4329, 65.3573), LatLong(55.4969, 65.3878),
+                        LatLong(55.5169, 65.3113), LatLong(55.4903, 65.2110)])
+
+
+def star(n, lat, lng, radius):
+    points = []
+    for i in range(n):
+        r = radius if i % 2 else radius / 3
+        angle = 2 * math.pi * i / n
+        points.append(LatLong(lat + r * math.cos(angle), lng + r * math.sin(angle)))
+    return Polygon(points)
+
+
+def brute_force(shape, z):
+    # every tile is tested with all edges
+    edges = _edges(shape)
+    tiles = set()
+    for x in range(1 << z):
+        for y in range(1 << z):
+            rect = tile_lat(z, y + 1), tile_long(z, x), tile_lat(z, y), tile_long(z, x + 1)
+            center = (rect[0] + rect[2]) / 2, (rect[1] + rect[3]) / 2
+            if any(_intersects(edges, e, rect) for e in range(len(edges[0]))) or center in shape:
+                tiles.add(ZXY(z, x, y))
+    return tiles
+
+
+SHAPES = [
+    star(30, 40, 20, 30),
+    Polygon([LatLong(-60, -170), LatLong(70, -170), LatLong(70, 170), LatLong(-60, 170)],
+            holes=[[LatLong(-20, -20), LatLong(20, -20), LatLong(20, 20), LatLong(-20, 20)]]),
+    Region([star(12, -30, -100, 20), star(8, 50, 100, 10)]),
+]
+
+
+@pytest.mark.parametrize("shape", SHAPES)
+def test_coverage_brute_force(shape):
+    tiles = list(coverage(shape, 0, 5))
+    assert len(tiles) == len(set(tiles))
+    for z in range(6):
+        assert {t for t in tiles if t.z == z} == brute_force(shape, z)
+
+
+@pytest.mark.parametrize("shape", SHAPES + [REAL_POLYGON])
+def test_coverage_metatiles(shape):
+    tiles = set(coverage(shape, 0, 8))
+    metatiles = list(coverage(shape, 0, 8, metatiles=True))
+    assert len(metatiles) == len(set(metatiles))
+
+    expected = set()
+    for z, x, y in tiles:
+        expected.add(ZXY(z, x & ~7, y & ~7))
+    assert set(metatiles) == expected
+
+
+def test_coverage_contains_points():
+    tiles = set(coverage(REAL_POLYGON, 10, 16))
+    rnd = random.Random(5)
+    for _ in range(500):
+        p = LatLong(rnd.uniform(55.40, 55.52), rnd.uniform(65.21, 65.39))
+        if p not in REAL_POLYGON:
+            continue
+        for z in (10, 14, 16):
+            assert ZXY(*latlong_to_zxy(p.lat, p.long, z)) in tiles
+
+
+def test_coverage_empty():
+    assert list(coverage(Polygon([LatLong(0, 0)]), 0, 5)) == []
+    assert list(coverage(Region([]), 0, 5)) == []
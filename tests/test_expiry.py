@@ -0,0 +1,54 @@
+#!/usr/bin/python
+
+import os
+
+import pytest
+
+import context  # noqa: F401
+from pyosmkit import expiry
+from pyosmkit.metatile import Metatile
+from pyosmkit.point import ZXY
+from pyosmkit.tile import Tile
+
+
+def test_read_expiry():
+    with pytest.raises(ValueError):
+        list(expiry.read_expiry(["10/697"]))
+
+
+@pytest.mark.parametrize("tiles,min_zoom,max_zoom,expected", [
+    ([ZXY(10, 697, 321)], None, None, [ZXY(10, 696, 320)]),
+    ([ZXY(10, 697, 321)], 11, 11, [ZXY(11, 1392, 640)]),
+    ([ZXY(10, 697, 321), ZXY(10, 703, 327)], 8, 8, [ZXY(8, 168, 80)]),
+    ([ZXY(2, 1, 1)], 0, 2, [ZXY(0, 0, 0), ZXY(1, 0, 0), ZXY(2, 0, 0)]),
+    ([ZXY(10, 697, 321)], 14, 14,
+     [ZXY(14, x, y) for x in range(11152, 11168, 8) for y in range(5136, 5152, 8)]),
+])
+def test_expire_metatiles(tiles, min_zoom, max_zoom, expected):
+    assert list(expiry.expire_metatiles(tiles, min_zoom, max_zoom)) == expected
+
+
+def test_expire_metatiles_children_cover():
+    z, x, y = 10, 697, 321
+    got = set(expiry.expire_metatiles([ZXY(z, x, y)], 13, 13))
+    for cx in range(x << 3, (x + 1) << 3):
+        for cy in range(y << 3, (y + 1) << 3):
+            assert ZXY(13, cx & ~7, cy & ~7) in got
+    assert len(got) == 1
+
+
+def test_metatile_paths():
+    mt = Metatile.from_tile(Tile(10, 697, 321, "mapname"))
+    assert list(expiry.metatile_paths([ZXY(10, 696, 320)], "mapname")) == [mt.filepath()]
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_touch_delete(tmp_path, jobs):
+    paths = [str(tmp_path / "{0}.meta".format(i)) for i in range(10)]
+    for p in paths[:5]:
+        open(p, "wb").close()
+
+    assert expiry.touch(paths, jobs=jobs) == 5
+    assert os.stat(paths[0]).st_mtime == expiry.DIRTY_MTIME
+    assert expiry.delete(paths, jobs=jobs) == 5
+    assert not os.listdir(str(tmp_path))
@@ -1,9 +1,15 @@
 #!/usr/bin/python
 
+import os
+import sqlite3
+from collections import OrderedDict
+
+import pytest
+
 import context  # noqa: F401
 import pyosmkit.mbtile
 from pyosmkit.mbtile.filelike import Metadata
-from pyosmkit.point import Bounds
+from pyosmkit.point import Bounds, ZXY
 
 
 def test_metadata():
@@ -41,3 +47,190 @@ def test_readtile():
         data = mb.readtile(1, 1, 0)
 
     assert len(data) == 26298
+
+
+def test_itertiles():
+    with pyosmkit.mbtile.open("tests/data/0.mbtiles") as mb:
+        expected = sorted((z, x, y, bytes(d)) for z, x, y, d in mb.readtiles())
+        tiles = sorted((z, x, y, bytes(d)) for z, x, y, d in mb.itertiles(batch_size=3))
+
+    assert tiles == expected
+
+
+def test_itertiles_zoom_bound():
+    with pyosmkit.mbtile.open("tests/data/0.mbtiles") as mb:
+        bound = mb.bounds.for_zoom(15)
+        by_zoom = sorted(t[:3] for t in mb.itertiles(zoom=15))
+        by_bound = sorted(t[:3] for t in mb.itertiles(bound=bound))
+
+    assert by_zoom == by_bound == sorted(tuple(p) for p in bound.points())
+
+
+def test_readtiles_many():
+    with pyosmkit.mbtile.open("tests/data/0.mbtiles") as mb:
+        points = [tuple(p) for b in mb.bounds for p in b.points()]
+        points.insert(1, (12, 999, 999))
+        expected = [mb.readtile(*p) if p != (12, 999, 999) else None for p in points]
+        data = mb.readtiles_many(points, chunk_size=7)
+
+    assert data == expected
+
+
+def test_write(tmp_path):
+    path = str(tmp_path / "out.mbtiles")
+    with pyosmkit.mbtile.open("tests/data/0.mbtiles") as src:
+        expected = sorted((z, x, y, bytes(d)) for z, x, y, d in src.itertiles())
+        with pyosmkit.mbtile.open(path, "wb", batch_size=100) as mb:
+            mb.writetiles(src.itertiles())
+            mb.writemetadata(center=src.metadata.center)
+
+    with pyosmkit.mbtile.open(path) as mb:
+        tiles = sorted((z, x, y, bytes(d)) for z, x, y, d in mb.itertiles())
+        metadata = mb.metadata
+
+    assert tiles == expected
+    assert metadata.format == "png"
+    assert metadata.center == "108.4003,52.03223,9"
+    assert (metadata.minzoom, metadata.maxzoom) == (0, 17)
+
+
+def test_write_append(tmp_path):
+    path = str(tmp_path / "out.mbtiles")
+    with pyosmkit.mbtile.open(path, "wb") as mb:
+        mb.writetile(1, 0, 0, b"\x89PNG 1")
+        mb.writetile(1, 1, 1, b"\x89PNG 2")
+
+    with pyosmkit.mbtile.open(path, "ab") as mb:
+        mb.writetile(1, 1, 1, b"\x89PNG 3")
+        mb.writetile(2, 3, 3, b"\x89PNG 4")
+
+    with pyosmkit.mbtile.open(path) as mb:
+        assert mb.readtile(1, 1, 1) == b"\x89PNG 3"
+        assert mb.readtile(2, 3, 3) == b"\x89PNG 4"
+        assert (mb.metadata.minzoom, mb.metadata.maxzoom) == (1, 2)
+        assert mb.metadata.bounds == "-180.0,-85.0511,180.0,85.0511"
+
+
+@pytest.mark.parametrize("dedup", [False, True])
+@pytest.mark.parametrize("batch_size", [1, 100])
+def test_write_duplicate(tmp_path, dedup, batch_size):
+    path = str(tmp_path / "out.mbtiles")
+    with pyosmkit.mbtile.open(path, "wb", dedup=dedup, batch_size=batch_size) as mb:
+        mb.writetile(1, 0, 0, b"\x89PNG 1")
+        mb.writetile(1, 1, 1, b"\x89PNG 2")
+        mb.writetile(1, 0, 0, b"\x89PNG 3")
+
+    with pyosmkit.mbtile.open(path, "ab") as mb:
+        mb.writetile(1, 1, 1, b"\x89PNG 4")
+
+    with pyosmkit.mbtile.open(path) as mb:
+        assert mb.readtile(1, 0, 0) == b"\x89PNG 3"
+        assert mb.readtile(1, 1, 1) == b"\x89PNG 4"
+        assert len(list(mb.itertiles())) == 2
+        assert mb.metadata.format == "png"
+
+
+def test_write_append_keeps_journal(tmp_path):
+    path = str(tmp_path / "out.mbtiles")
+    with pyosmkit.mbtile.open(path, "wb") as mb:
+        mb.writetile(1, 0, 0, b"\x89PNG 1")
+        assert mb._conn.execute("PRAGMA journal_mode").fetchone()[0] == "off"
+
+    with pyosmkit.mbtile.open(path, "ab") as mb:
+        assert mb._conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+        assert mb._conn.execute("PRAGMA synchronous").fetchone()[0] != 0
+        mb.writetile(1, 1, 1, b"\x89PNG 2")
+
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    conn.close()
+
+
+def test_write_read_mode():
+    with pyosmkit.mbtile.open("tests/data/0.mbtiles") as mb:
+        with pytest.raises(IOError, match="not opened for writing"):
+            mb.writetile(1, 0, 0, b"\x89PNG")
+        with pytest.raises(IOError, match="not opened for writing"):
+            mb.writemetadata(name="map")
+
+
+def test_write_dedup(tmp_path):
+    path = str(tmp_path / "out.mbtiles")
+    with pyosmkit.mbtile.open(path, "wb", dedup=True) as mb:
+        for x in range(4):
+            for y in range(4):
+                mb.writetile(2, x, y, b"\x89PNG ocean" if x else b"\x89PNG land %d" % y)
+
+    with pyosmkit.mbtile.open(path, "ab") as mb:
+        assert mb.dedup
+        mb.writetile(3, 0, 0, b"\x89PNG ocean")
+
+    with pyosmkit.mbtile.open(path) as mb:
+        assert mb.dedup
+        assert mb.dedup_ratio == 17.0 / 5
+        assert mb.readtile(2, 0, 1) == b"\x89PNG land 1"
+        assert mb.readtile(3, 0, 0) == b"\x89PNG ocean"
+        assert len(list(mb.itertiles())) == 17
+        assert str(mb.bounds.for_zoom(2)) == "Bound(z:2 x:0-3 y:0-3)"
+
+
+def test_bounds_trust_metadata():
+    with pyosmkit.mbtile.open("tests/data/0.mbtiles") as mb:
+        expected = [str(b) for b in mb.bounds]
+    with pyosmkit.mbtile.open("tests/data/0.mbtiles", trust_bounds=True) as mb:
+        bounds = [str(b) for b in mb.bounds]
+
+    assert bounds == expected
+
+
+def test_bounds_trust_metadata_written(tmp_path):
+    # edges of written bounds lie exactly on tiles boundaries
+    path = str(tmp_path / "out.mbtiles")
+    with pyosmkit.mbtile.open(path, "wb") as mb:
+        for x in range(697, 700):
+            for y in range(321, 323):
+                mb.writetile(10, x, y, b"\x89PNG")
+                mb.writetile(17, x << 7, y << 7, b"\x89PNG")
+                mb.writetile(17, (x << 7) + 127, (y << 7) + 127, b"\x89PNG")
+
+    with pyosmkit.mbtile.open(path) as mb:
+        expected = [str(b) for b in mb.bounds]
+    with pyosmkit.mbtile.open(path, trust_bounds=True) as mb:
+        bounds = [str(mb.bounds.for_zoom(10)), str(mb.bounds.for_zoom(17))]
+        assert ZXY(10, 699, 322) in mb
+        assert ZXY(10, 700, 322) not in mb and ZXY(10, 699, 323) not in mb
+
+    assert bounds == expected == ["Bound(z:10 x:697-699 y:321-322)",
+                                  "Bound(z:17 x:89216-89599 y:41088-41343)"]
+
+
+def test_bounds_registry(tmp_path):
+    path = str(tmp_path / "out.mbtiles")
+    with pyosmkit.mbtile.open(path, "wb") as mb:
+        mb.writetile(1, 0, 0, b"1")
+
+    with pyosmkit.mbtile.open(path) as mb1, pyosmkit.mbtile.open(path) as mb2:
+        assert mb1.bounds is mb2.bounds
+
+    with pyosmkit.mbtile.open(path, "ab") as mb:
+        mb.writetile(1, 1, 1, b"2")
+    os.utime(path, ns=(0, 0))
+
+    with pyosmkit.mbtile.open(path) as mb:
+        assert str(mb.bounds.for_zoom(1)) == "Bound(z:1 x:0-1 y:0-1)"
+
+
+def test_bounds_registry_size(tmp_path, monkeypatch):
+    monkeypatch.setattr(pyosmkit.mbtile.filelike, "BOUNDS_REGISTRY_SIZE", 2)
+    monkeypatch.setattr(pyosmkit.mbtile.filelike, "_bounds_registry", OrderedDict())
+    paths = [str(tmp_path / "{0}.mbtiles".format(i)) for i in range(3)]
+    for path in paths:
+        with pyosmkit.mbtile.open(path, "wb") as mb:
+            mb.writetile(1, 0, 0, b"1")
+
+    for path in paths[:2] + paths[:1] + paths[2:]:
+        with pyosmkit.mbtile.open(path) as mb:
+            mb.bounds
+
+    registry = pyosmkit.mbtile.filelike._bounds_registry
+    assert [key[0] for key in registry] == [os.path.realpath(p) for p in (paths[0], paths[2])]
@@ -0,0 +1,57 @@
+#!/usr/bin/python
+
+import threading
+
+import pytest
+
+import context  # noqa: F401
+import pyosmkit.mbtile
+from pyosmkit.point import ZXY
+
+
+def test_pool_shared_metadata():
+    with pyosmkit.mbtile.open("tests/data/0.mbtiles") as mb:
+        metadata = mb.metadata
+
+    with pyosmkit.mbtile.Pool("tests/data/0.mbtiles", size=2) as pool:
+        assert pool.metadata == metadata
+        assert ZXY(1, 1, 0) in pool
+        with pool.reader() as mb1, pool.reader() as mb2:
+            assert mb1 is not mb2
+            assert mb1.metadata is mb2.metadata
+            assert mb1.bounds is mb2.bounds
+
+
+def test_pool_threads():
+    errors = []
+    with pyosmkit.mbtile.Pool("tests/data/0.mbtiles", size=2) as pool:
+        points = [tuple(p) for b in pool.bounds for p in b.points()]
+
+        def worker():
+            try:
+                for p in points:
+                    assert pool.readtile(*p)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        stats = pool.stats()
+
+    assert not errors
+    assert stats.checkouts == 4 * len(points)
+    assert stats.max_wait_time >= 0
+
+
+def test_pool_timeout():
+    with pyosmkit.mbtile.Pool("tests/data/0.mbtiles", size=1) as pool:
+        with pool.reader():
+            with pytest.raises(TimeoutError):
+                with pool.reader(timeout=0.01):
+                    pass
+
+        assert pool.stats().checkouts == 1
@@ -4,7 +4,10 @@ import pytest
 
 import context  # noqa: F401
 from pyosmkit.tile import Tile
-from pyosmkit.metatile import Metatile
+from pyosmkit.metatile import Metatile, bound_to_metatiles
+from pyosmkit.metatile.metatile import (hashes_to_xy, hashes_to_xy_many, metatile_paths_many,
+                                        xy_to_hashes, xy_to_hashes_many)
+from pyosmkit.point import Bound
 
 
 def test_metatile_from_url():
@@ -86,3 +89,54 @@ def test_metatile_points_order(url):
         points.append(p)
 
     assert points == mt.points()
+
+
+def test_metatile_slots_and_hash():
+    mt = Metatile.from_url("mapname/10/0/0/33/180/128.meta")
+    with pytest.raises(AttributeError):
+        mt.__dict__
+
+    assert mt._xy is None
+    assert mt.filepath() == "mapname/10/0/0/33/180/128.meta"
+    assert mt._xy is None
+
+    same = Metatile.from_tile(Tile(10, 697, 321, "mapname"))
+    assert len({mt, same}) == 1
+    assert mt != None and mt != "mapname/10/0/0/33/180/128.meta"  # noqa: E711
+    assert (mt.x, mt.y, mt.max_x, mt.max_y) == (696, 320, 703, 327)
+
+
+def test_hashes_many():
+    xs = [0, 7, 697, 1 << 19, (1 << 20) - 1]
+    ys = [0, 9, 321, 5, (1 << 20) - 3]
+    columns = xy_to_hashes_many(xs, ys)
+    for i, (x, y) in enumerate(zip(xs, ys)):
+        hashes = xy_to_hashes(x, y)
+        assert [int(column[i]) for column in columns] == hashes
+        assert hashes_to_xy(hashes) == (x & ~7, y & ~7)
+
+    mxs, mys = hashes_to_xy_many(columns)
+    assert [int(x) for x in mxs] == [x & ~7 for x in xs]
+    assert [int(y) for y in mys] == [y & ~7 for y in ys]
+
+
+@pytest.mark.parametrize("bound", [
+    Bound(z=10, min_x=692, min_y=318, max_x=703, max_y=324),
+    Bound(z=2, min_x=0, min_y=0, max_x=3, max_y=3),
+    Bound(z=16, min_x=40000, min_y=20000, max_x=40100, max_y=20017),
+])
+def test_bound_to_metatiles_outputs(bound):
+    metatiles = list(bound_to_metatiles(bound, style="mapname"))
+    records = list(bound_to_metatiles(bound, style="mapname", output="records"))
+    paths = list(bound_to_metatiles(bound, style="mapname", output="paths", basedir="/cache"))
+
+    assert records == [(mt.z, mt.x, mt.y) for mt in metatiles]
+    assert paths == [mt.filepath("/cache") for mt in metatiles]
+    assert paths == metatile_paths_many(bound.z, [r.x for r in records], [r.y for r in records],
+                                        "mapname", "/cache")
+    assert [str(mt) for mt in metatiles] == [str(Metatile.from_url(p)) for p in paths]
+
+
+def test_bound_to_metatiles_unknown_output():
+    with pytest.raises(ValueError):
+        bound_to_metatiles(Bound(z=1, min_x=0, min_y=0, max_x=1, max_y=1), output="tiles")
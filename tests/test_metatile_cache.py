@@ -0,0 +1,68 @@
+#!/usr/bin/python
+
+import os
+import shutil
+
+import pytest
+
+import context  # noqa: F401
+import pyosmkit.metatile
+from data.index_table import test_index, test_file
+
+
+@pytest.mark.parametrize("max_bytes", [0, 1024 * 1024])
+def test_cache_readtile(max_bytes):
+    cache = pyosmkit.metatile.Cache(max_files=4, max_bytes=max_bytes)
+    with pyosmkit.metatile.open(test_file) as mt:
+        expected = {p: bytes(d) for p, d in mt.readtiles().items()}
+
+    for _ in range(2):
+        for p in test_index:
+            assert bytes(cache.readtile(test_file, p.x, p.y)) == expected[p]
+
+    stats = cache.stats()
+    assert (stats.hits, stats.misses) == (127, 1)
+    assert stats.data_hits == (127 if max_bytes else 0)
+
+
+def test_cache_invalidated_by_mtime(tmp_path):
+    path = str(tmp_path / "0.meta")
+    shutil.copy(test_file, path)
+    cache = pyosmkit.metatile.Cache()
+
+    assert cache.index(path) == test_index
+    os.utime(path, ns=(0, 0))
+    assert cache.header(path).z == 1
+
+    assert cache.stats().misses == 2
+
+
+def test_cache_eviction(tmp_path):
+    paths = []
+    for i in range(3):
+        paths.append(str(tmp_path / "{0}.meta".format(i)))
+        shutil.copy(test_file, paths[-1])
+
+    cache = pyosmkit.metatile.Cache(max_files=2, max_bytes=1024 * 1024)
+    for path in paths:
+        cache.readtile(path, 0, 0)
+
+    assert paths[0] not in cache
+    assert len(cache) == 2
+    assert cache.stats().evictions == 1
+
+
+def test_cache_outside():
+    cache = pyosmkit.metatile.Cache()
+    with pytest.raises(KeyError):
+        cache.readtile(test_file, 10, 10)
+
+
+def test_cache_data_is_readonly():
+    cache = pyosmkit.metatile.Cache(max_bytes=1024 * 1024)
+    tile = cache.readtile(test_file, 1, 1)
+    expected = bytes(tile)
+    with pytest.raises(TypeError):
+        tile[0:4] = b"XXXX"
+
+    assert bytes(cache.readtile(test_file, 1, 1)) == expected
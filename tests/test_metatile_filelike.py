@@ -1,6 +1,7 @@
 #!/usr/bin/python
 
 import filecmp
+import os
 
 import pytest
 
@@ -82,19 +83,20 @@ def test_metatile_readtiles():
     assert size == valid_size
 
 
-def test_metatile_write():
+def test_metatile_write(tmp_path):
     with pyosmkit.metatile.open(test_file, "rb") as mt:
         header = mt.header
         data = mt.readtiles()
 
-    with pyosmkit.metatile.open(test_file + ".tmp", "wb") as mt:
+    path = str(tmp_path / "0.meta")
+    with pyosmkit.metatile.open(path, "wb") as mt:
         mt.write(x=header.x, y=header.y, z=header.z, data=data)
 
-    diff = filecmp.cmp(test_file, test_file + ".tmp")
+    diff = filecmp.cmp(test_file, path)
     assert diff
 
 
-def test_metatile_write_short():
+def test_metatile_write_short(tmp_path):
     with pyosmkit.metatile.open(test_file, "rb") as mt:
         header = mt.header
         data = mt.readtiles()
@@ -104,8 +106,137 @@ def test_metatile_write_short():
         if d:
             data_none_empty[p] = d
 
-    with pyosmkit.metatile.open(test_file + ".tmp", "wb") as mt:
+    path = str(tmp_path / "0.meta")
+    with pyosmkit.metatile.open(path, "wb") as mt:
         mt.write(x=header.x, y=header.y, z=header.z, data=data_none_empty)
 
-    diff = filecmp.cmp(test_file, test_file + ".tmp")
+    diff = filecmp.cmp(test_file, path)
     assert diff
+
+
+def test_metatile_open_mmap_wrong_mode(tmp_path):
+    with pytest.raises(IOError):
+        pyosmkit.metatile.open(str(tmp_path / "0.meta"), "wb", mmap=True)
+
+
+@pytest.mark.parametrize("mmap", [False, True])
+def test_metatile_open_empty(tmp_path, mmap):
+    path = tmp_path / "0.meta"
+    path.write_bytes(b"")
+    with pytest.raises(IOError, match="wrong metatile header"):
+        pyosmkit.metatile.open(str(path), "rb", mmap=mmap)
+
+
+def test_metatile_mmap_index():
+    with pyosmkit.metatile.open(test_file, "rb", mmap=True) as mt:
+        assert str(mt.header) == "Header(count=64, x=0, y=0, z=1)"
+        assert test_index == mt.index
+
+
+def test_metatile_mmap_readtiles():
+    with pyosmkit.metatile.open(test_file, "rb") as mt:
+        expected = mt.readtiles()
+
+    with pyosmkit.metatile.open(test_file, "rb", mmap=True) as mt:
+        data = mt.readtiles()
+        assert all(isinstance(d, memoryview) for d in data.values())
+        assert {p: bytes(d) for p, d in data.items()} == expected
+
+
+def test_metatile_mmap_close_with_views():
+    with pyosmkit.metatile.open(test_file, "rb", mmap=True) as mt:
+        data = mt.readtile(0, 0)
+
+    assert len(data) == test_index[(0, 0)].size
+
+
+def test_metatile_index_lookup():
+    with pyosmkit.metatile.open(test_file, "rb") as mt:
+        index = mt.index
+
+    assert index[(1, 0)] == test_index[(1, 0)]
+    assert list(index) == sorted(test_index)
+    assert len(index) == 64
+    for key in [(8, 0), (0, -1), None, (1, 2, 3)]:
+        assert key not in index
+        with pytest.raises(KeyError):
+            index[key]
+
+
+@pytest.mark.parametrize("mmap", [False, True])
+def test_metatile_readtiles_points(mmap):
+    points = [(1, 0), (0, 2), (1, 1)]
+    with pyosmkit.metatile.open(test_file, "rb", mmap=mmap) as mt:
+        expected = {Point(*p): mt.readtile(*p) for p in points}
+        data = mt.readtiles(points=points)
+
+    assert data == expected
+
+
+def test_metatile_readtiles_points_empty():
+    with pyosmkit.metatile.open(test_file, "rb") as mt:
+        data = mt.readtiles(points=[(0, 2), (0, 3)])
+
+    assert [len(d) for d in data.values()] == [0, 0]
+
+
+def test_metatile_readtiles_points_outside():
+    with pyosmkit.metatile.open(test_file, "rb") as mt:
+        with pytest.raises(KeyError):
+            mt.readtiles(points=[(10, 10)])
+
+
+def test_metatile_write_stream(tmp_path):
+    with pyosmkit.metatile.open(test_file, "rb") as mt:
+        header = mt.header
+        data = mt.readtiles()
+
+    path = str(tmp_path / "stream.meta")
+    stream = ((p.x, p.y, d) for p, d in reversed(list(data.items())) if d)
+    with pyosmkit.metatile.open(path, "wb") as mt:
+        mt.write(x=header.x, y=header.y, z=header.z, data=stream)
+
+    with pyosmkit.metatile.open(path, "rb") as mt:
+        assert mt.header == header
+        assert mt.readtiles() == data
+
+
+@pytest.mark.parametrize("stream", [
+    [(8, 0, b"1")],
+    [(0, 0, b"1"), (0, 0, b"2")],
+])
+def test_metatile_write_stream_raises(tmp_path, stream):
+    with pytest.raises(ValueError):
+        with pyosmkit.metatile.open(str(tmp_path / "stream.meta"), "wb") as mt:
+            mt.write(x=0, y=0, z=1, data=iter(stream))
+
+    # file without header and index is not left
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_metatile_write_atomic(tmp_path):
+    with pyosmkit.metatile.open(test_file, "rb") as mt:
+        header = mt.header
+        data = mt.readtiles()
+
+    path = str(tmp_path / "atomic.meta")
+    with pyosmkit.metatile.open(path, "wb", atomic=True) as mt:
+        mt.write(x=header.x, y=header.y, z=header.z, data=data)
+        assert not os.path.exists(path)
+
+    assert filecmp.cmp(test_file, path)
+    assert os.listdir(str(tmp_path)) == ["atomic.meta"]
+
+
+def test_metatile_write_atomic_discard(tmp_path):
+    path = str(tmp_path / "atomic.meta")
+    with pytest.raises(ValueError):
+        with pyosmkit.metatile.open(path, "wb", atomic=True) as mt:
+            mt.write(x=0, y=0, z=1, data=iter([(8, 8, b"1")]))
+
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_metatile_atomic_wrong_mode():
+    with pytest.raises(IOError):
+        pyosmkit.metatile.open(test_file, "rb", atomic=True)
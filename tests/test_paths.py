@@ -0,0 +1,55 @@
+#!/usr/bin/python
+
+import pytest
+
+import context  # noqa: F401
+from pyosmkit.metatile import Metatile
+from pyosmkit.paths import convert_many, parse_metatile_path, parse_tile_path
+from pyosmkit.tile import Tile
+
+
+@pytest.mark.parametrize("path", [
+    "mapname/10/697/321.png",
+    "/var/lib/mod_tile/mapname/1/0/1.mvt",
+    "1/2/3/4.png",
+    "cache.d/mapname/10/697/321.png",
+    "mapname/10/697/321.tar.gz",
+    "mapname/10/697/321.png/other/1/2/3.png",
+])
+def test_convert_many_tile(path):
+    t = Tile.from_url(path)
+    expected = Metatile.from_tile(t).filepath("/cache")
+    assert list(convert_many([path], basedir="/cache")) == [expected]
+
+
+@pytest.mark.parametrize("path", [
+    "mapname/10/0/0/33/180/128.meta",
+    "/var/lib/mod_tile/mapname/1/0/0/0/0/0.meta",
+    "a.b/mapname/10/0/0/33/180/128.meta",
+])
+def test_convert_many_metatile(path):
+    mt = Metatile.from_url(path)
+    expected = Tile.from_metatile(mt, ".mvt").filepath()
+    assert list(convert_many([path], ext=".mvt")) == [expected]
+
+
+@pytest.mark.parametrize("path", [
+    "mapname/10/697/321",
+    "mapname/10/0/0/33/180.meta",
+    "mapname/x/697/321.png",
+])
+def test_convert_many_invalid(path):
+    with pytest.raises(ValueError):
+        list(convert_many([path]))
+
+
+def test_convert_many_unique():
+    paths = ["mapname/10/{0}/{1}.png".format(x, y)
+             for x in range(696, 712) for y in range(320, 328)]
+    assert len(list(convert_many(paths))) == 2
+    assert len(list(convert_many(paths, unique=False))) == len(paths)
+
+
+def test_parse_fallback():
+    assert parse_tile_path("mapname/10/697/321") is None
+    assert parse_metatile_path("mapname/10/0/0/33/180.meta") is None
@@ -1,8 +1,11 @@
 #!/usr/bin/python
 
+from array import array
+
 import pytest
 import context  # noqa: F401
-from pyosmkit.point import LatLong, ZXY, zxy_to_latlong, latlong_to_zxy
+from pyosmkit.point import Bound, Bounds, LatLong, ZXY, zxy_to_latlong, latlong_to_zxy, \
+    zxy_to_latlong_many, latlong_to_zxy_many, _zxy_to_latlong_many, _latlong_to_zxy_many
 
 
 @pytest.mark.parametrize("z,x,y,expected", [
@@ -17,3 +20,95 @@ def test_zxy_to_latlong(z, x, y, expected):
 ])
 def test_latlong_to_zxy(lat, lng, expected):
     assert latlong_to_zxy(lat, lng, 10) == expected
+
+
+ZXYS = [(z, x, y) for z in (0, 1, 10, 18)
+        for x, y in ((0, 0), (1, 0), (697, 321), (2**z - 1, 2**z - 1)) if x < 2**z and y < 2**z]
+
+
+@pytest.mark.parametrize("func", [zxy_to_latlong_many, _zxy_to_latlong_many])
+def test_zxy_to_latlong_many(func):
+    zs, xs, ys = zip(*ZXYS)
+    lats, longs = func(list(zs), array("q", xs), array("q", ys))
+    expected = [zxy_to_latlong(z, x, y) for z, x, y in ZXYS]
+    assert [LatLong(float(lat), float(lng)) for lat, lng in zip(lats, longs)] == expected
+
+
+@pytest.mark.parametrize("func", [latlong_to_zxy_many, _latlong_to_zxy_many])
+def test_latlong_to_zxy_many(func):
+    lls = [(55.5783, 65.0391), (-33.8688, 151.2093), (0.0, 0.0), (85.0, -180.0), (-85.0, 179.99)]
+    lats, lngs = zip(*lls)
+    for zoom in (0, 5, 10, 18):
+        xs, ys = func(array("d", lats), list(lngs), zoom)
+        expected = [latlong_to_zxy(lat, lng, zoom) for lat, lng in lls]
+        assert [ZXY(zoom, int(x), int(y)) for x, y in zip(xs, ys)] == expected
+
+    xs, ys = func([90.0], [0.0], 10)
+    assert [ZXY(10, int(xs[0]), int(ys[0]))] == [latlong_to_zxy(90.0, 0.0, 10)]
+    with pytest.raises(ValueError):
+        latlong_to_zxy(-90.0, 0.0, 10)
+    with pytest.raises(ValueError):
+        func([55.0, -90.0], [0.0, 0.0], 10)
+
+
+def test_zxy_range():
+    bound = Bound(z=10, min_x=690, max_x=700, min_y=318, max_y=324)
+    expected = [ZXY(10, x, y) for x in range(690, 701) for y in range(318, 325)]
+    points = bound.points()
+
+    assert len(points) == len(expected) == 77
+    assert list(points) == expected
+    assert [points[i] for i in (0, 5, -1)] == [expected[i] for i in (0, 5, -1)]
+    assert list(points[3:60:7]) == expected[3:60:7]
+    assert list(points[::-1][10:20]) == expected[::-1][10:20]
+    assert all(p in points for p in expected)
+    assert ZXY(10, 689, 318) not in points and ZXY(11, 690, 318) not in points
+    assert [p in points[3:60:7] for p in expected] == [p in expected[3:60:7] for p in expected]
+
+
+def test_zxy_range_empty():
+    points = Bound(z=1, min_x=1, max_x=0, min_y=0, max_y=0).points()
+    assert len(points) == 0 and list(points) == [] and list(points.chunks()) == []
+
+
+def test_bounds_chunks():
+    bounds = Bounds([
+        Bound(z=12, min_x=3281, max_x=3281, min_y=1352, max_y=1352),
+        Bound(z=15, min_x=26248, max_x=26253, min_y=10816, max_y=10821),
+    ])
+    points = []
+    for z, xs, ys in bounds.chunks(size=5):
+        assert len(xs) == len(ys) <= 5
+        points.extend(ZXY(z, int(x), int(y)) for x, y in zip(xs, ys))
+
+    assert bounds.count() == 37
+    assert points == list(bounds.points())
+
+
+def test_bounds_append_merge():
+    bounds = Bounds([
+        Bound(z=10, min_x=0, max_x=9, min_y=0, max_y=9),
+        Bound(z=10, min_x=2, max_x=3, min_y=2, max_y=3),
+        Bound(z=10, min_x=0, max_x=9, min_y=10, max_y=19),
+        Bound(z=10, min_x=10, max_x=12, min_y=0, max_y=19),
+        Bound(z=10, min_x=50, max_x=60, min_y=50, max_y=60),
+        Bound(z=11, min_x=0, max_x=0, min_y=0, max_y=0),
+    ])
+
+    assert [str(b) for b in bounds.for_zoom_all(10)] == [
+        "Bound(z:10 x:0-12 y:0-19)", "Bound(z:10 x:50-60 y:50-60)"]
+    assert len(list(bounds)) == 3
+
+
+def test_bounds_contains_many():
+    bounds = Bounds([
+        Bound(z=10, min_x=0, max_x=9, min_y=0, max_y=9),
+        Bound(z=10, min_x=50, max_x=60, min_y=50, max_y=60),
+    ])
+    points = [ZXY(10, x, y) for x in range(0, 70, 3) for y in range(0, 70, 3)]
+    points += [ZXY(11, 0, 0), ZXY(9, 5, 5)]
+    expected = [any(p in b for b in bounds) for p in points]
+
+    assert bounds.contains_many(points) == expected
+    assert [p in bounds for p in points] == expected
+    assert sum(expected) == 32
@@ -0,0 +1,154 @@
+#!/usr/bin/python
+
+import math
+import random
+
+import pytest
+
+import context  # noqa: F401
+from pyosmkit.point import LatLong
+from pyosmkit.polygon import Polygon, Region
+from pyosmkit.polygon.raycasting import is_point_inside
+
+REAL_POLYGON = [LatLong(55.4903, 65.2110), LatLong(55.4066, 65.2275),
+                LatLong(55.4329, 65.3573), LatLong(55.4969, 65.3878),
+                LatLong(55.5169, 65.3113), LatLong(55.4903, 65.2110)]
+
+
+def star(n, radius=10.0):
+    # non-convex polygon with n vertices
+    points = []
+    for i in range(n):
+        r = radius if i % 2 else radius / 3
+        angle = 2 * math.pi * i / n
+        points.append(LatLong(r * math.cos(angle), r * math.sin(angle)))
+    return points
+
+
+def test_polygon_few_points():
+    polygon = Polygon([LatLong(0, 0), LatLong(1, 1)])
+    assert LatLong(0, 0) not in polygon
+    assert polygon.bbox is None
+
+
+@pytest.mark.parametrize("points", [
+    [LatLong(0, 0), LatLong(10, 0), LatLong(10, 10), LatLong(0, 10), LatLong(0, 0)],
+    [LatLong(0, 0), LatLong(10, 0), LatLong(10, 10), LatLong(0, 10)],
+])
+def test_polygon_does_not_mutate_points(points):
+    copy = list(points)
+    polygon = Polygon(points)
+    assert LatLong(1, 1) in polygon
+    assert LatLong(11, 11) not in polygon
+    assert points == copy
+    assert len(polygon) == len(copy)
+
+
+@pytest.mark.parametrize("points", [REAL_POLYGON, REAL_POLYGON[:-1], star(20), star(2000)])
+def test_polygon_same_as_raycasting(points):
+    polygon = Polygon(points)
+    min_lat, min_long, max_lat, max_long = polygon.bbox
+    rnd = random.Random(1)
+    for _ in range(2000):
+        p = LatLong(rnd.uniform(min_lat - 1, max_lat + 1), rnd.uniform(min_long - 1, max_long + 1))
+        assert (p in polygon) == is_point_inside(p, points)
+
+
+def test_polygon_holes():
+    outer = [LatLong(0, 0), LatLong(10, 0), LatLong(10, 10), LatLong(0, 10)]
+    hole = [LatLong(2, 2), LatLong(4, 2), LatLong(4, 4), LatLong(2, 4), LatLong(2, 2)]
+    polygon = Polygon(outer, holes=[hole])
+    assert LatLong(1, 1) in polygon
+    assert LatLong(3, 3) not in polygon
+    assert LatLong(5, 5) in polygon
+
+
+@pytest.mark.parametrize("points", [REAL_POLYGON, star(20), star(2000), REAL_POLYGON[:2]])
+def test_polygon_contains_many(points):
+    polygon = Polygon(points)
+    rnd = random.Random(2)
+    lats = [rnd.uniform(-12, 12) for _ in range(3000)] + [p.lat for p in points]
+    longs = [rnd.uniform(-12, 12) for _ in range(3000)] + [p.long for p in points]
+    # points near real polygon
+    lats += [rnd.uniform(55.3, 55.6) for _ in range(1000)]
+    longs += [rnd.uniform(65.1, 65.5) for _ in range(1000)]
+
+    mask = polygon.contains_many(lats, longs)
+    assert len(mask) == len(lats)
+    assert [bool(v) for v in mask] == [(lat, lng) in polygon for lat, lng in zip(lats, longs)]
+
+
+def test_region_contains_many():
+    square = Polygon([LatLong(0, 0), LatLong(10, 0), LatLong(10, 10), LatLong(0, 10)])
+    region = Region([square, Polygon(star(50)), Polygon(REAL_POLYGON)])
+    rnd = random.Random(3)
+    lats = [rnd.uniform(-12, 60) for _ in range(3000)]
+    longs = [rnd.uniform(-12, 70) for _ in range(3000)]
+
+    mask = region.contains_many(lats, longs)
+    assert [bool(v) for v in mask] == [LatLong(*p) in region for p in zip(lats, longs)]
+    assert len(Region([]).contains_many(lats, longs)) == len(lats)
+
+
+def test_region_which():
+    # grid of squares with gaps between them
+    polygons = []
+    for i in range(30):
+        for j in range(30):
+            lat, lng = i * 2.0, j * 2.0
+            polygons.append(Polygon([LatLong(lat, lng), LatLong(lat + 1, lng),
+                                     LatLong(lat + 1, lng + 1), LatLong(lat, lng + 1)]))
+    # overlapping polygon, the first one is returned
+    polygons.append(Polygon([LatLong(-1, -1), LatLong(70, -1), LatLong(70, 70), LatLong(-1, 70)]))
+    region = Region(polygons)
+
+    assert region.which(LatLong(0.5, 0.5)) == 0
+    assert region.which(LatLong(2.5, 4.5)) == 32
+    assert region.which(LatLong(1.5, 1.5)) == len(polygons) - 1
+    assert region.which(LatLong(80, 80)) is None
+    assert LatLong(58.5, 58.5) in region
+
+    rnd = random.Random(4)
+    for _ in range(2000):
+        p = LatLong(rnd.uniform(-2, 72), rnd.uniform(-2, 72))
+        expected = next((i for i, polygon in enumerate(polygons) if p in polygon), None)
+        assert region.which(p) == expected
+
+
+def test_region_contains_many_grid():
+    # polygon which records calls, to check that only polygons of the grid cell are tested
+    class TracedPolygon(Polygon):
+        tested = set()
+
+        def __contains__(self, item):
+            self.tested.add(id(self))
+            return super().__contains__(item)
+
+        def contains_many(self, lats, longs):
+            self.tested.add(id(self))
+            return super().contains_many(lats, longs)
+
+    polygons = []
+    for i in range(10):
+        for j in range(10):
+            lat, lng = i * 2.0, j * 2.0
+            polygons.append(TracedPolygon([LatLong(lat, lng), LatLong(lat + 1, lng),
+                                           LatLong(lat + 1, lng + 1), LatLong(lat, lng + 1)]))
+    region = Region(polygons)
+
+    rnd = random.Random(5)
+    lats = [rnd.uniform(-2, 22) for _ in range(2000)]
+    longs = [rnd.uniform(-2, 22) for _ in range(2000)]
+    expected = [LatLong(lat, lng) in region for lat, lng in zip(lats, longs)]
+    assert [bool(v) for v in region.contains_many(lats, longs)] == expected
+
+    TracedPolygon.tested.clear()
+    mask = region.contains_many([0.5, 0.2, 1.5], [0.5, 0.7, 1.5])
+    assert [bool(v) for v in mask] == [True, True, False]
+    assert id(polygons[0]) in TracedPolygon.tested
+    assert len(TracedPolygon.tested) < len(polygons) // 4
+
+
+def test_region_which_empty():
+    assert Region([]).which(LatLong(0, 0)) is None
+    assert Region([Polygon([LatLong(0, 0)])]).which(LatLong(0, 0)) is None
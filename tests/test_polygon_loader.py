@@ -0,0 +1,95 @@
+#!/usr/bin/python
+
+import json
+
+import pytest
+
+import context  # noqa: F401
+from pyosmkit.point import LatLong
+from pyosmkit.polygon import Polygon, load_geojson, load_poly, read_geojson, read_poly
+
+POLY = """test area
+first_area
+     0.1E+01     0.1E+01
+    10 1
+    10 10
+    1 10
+    1 1
+END
+!hole
+    4 4
+    6 4
+    6 6
+    4 6
+END
+island
+    20 20
+    21 20
+    21 21
+END
+END
+"""
+
+
+def test_load_poly(tmp_path):
+    path = tmp_path / "area.poly"
+    path.write_text(POLY)
+    region = load_poly(str(path))
+
+    assert len(region) == 2
+    assert LatLong(2, 2) in region
+    assert LatLong(5, 5) not in region
+    assert LatLong(20.2, 20.5) in region
+    assert LatLong(30, 30) not in region
+    # longitude goes first in poly file
+    assert region.which(LatLong(20.2, 20.5)) == 1
+
+
+@pytest.mark.parametrize("lines", [
+    [],
+    ["name", "1", "  1 1", "END"],
+    ["name", "1", "  1", "END", "END"],
+])
+def test_read_poly_invalid(lines):
+    with pytest.raises(ValueError):
+        read_poly(lines)
+
+
+def test_load_geojson(tmp_path):
+    square = [[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]]
+    hole = [[4, 4], [6, 4], [6, 6], [4, 6], [4, 4]]
+    obj = {"type": "FeatureCollection", "features": [
+        {"type": "Feature", "properties": {}, "geometry": {
+            "type": "Polygon", "coordinates": [square, hole]}},
+        {"type": "Feature", "properties": {}, "geometry": {
+            "type": "Point", "coordinates": [50, 50]}},
+        {"type": "Feature", "properties": {}, "geometry": None},
+        {"type": "Feature", "properties": {}, "geometry": {
+            "type": "MultiPolygon", "coordinates": [[[[20, 30], [21, 30], [21, 31], [20, 30]]]]}},
+    ]}
+    path = tmp_path / "area.geojson"
+    path.write_text(json.dumps(obj))
+    region = load_geojson(str(path))
+
+    assert len(region) == 2
+    assert LatLong(1, 2) in region
+    assert LatLong(5, 5) not in region
+    # GeoJSON positions are [longitude, latitude]
+    assert LatLong(30.2, 20.5) in region
+    assert LatLong(20.5, 30.2) not in region
+
+
+def test_read_geojson_invalid():
+    with pytest.raises(ValueError):
+        read_geojson({"type": "Circle"})
+
+
+def test_polygon_from_arrays():
+    points = [LatLong(0, 0), LatLong(10, 0), LatLong(10, 10), LatLong(0, 10)]
+    region = read_geojson({"type": "Polygon", "coordinates": [[[p.long, p.lat] for p in points]]})
+    polygon = Polygon(points)
+
+    for p in [LatLong(1, 2), LatLong(11, 2), LatLong(9.9, 0.1)]:
+        assert (p in region) == (p in polygon)
+    assert str(region._polygons[0]) == str(Polygon([LatLong(float(p.lat), float(p.long))
+                                                    for p in points]))
@@ -36,3 +36,13 @@ def test_tile_from_url():
 def test_tile_from_url_raises(url):
     with pytest.raises(ValueError):
         Tile.from_url(url)
+
+
+def test_tile_slots_and_hash():
+    t = Tile(10, 1, 2, "mapname")
+    with pytest.raises(AttributeError):
+        t.__dict__
+
+    assert t == Tile(10, 1, 2, "mapname")
+    assert t != Tile(10, 1, 2, "other")
+    assert len({t, Tile(10, 1, 2, "mapname")}) == 1